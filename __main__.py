@@ -0,0 +1,97 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import argparse
+import os
+import sys
+
+from .generator import generate
+from .options import Options
+from .schema_cache import TD_API_URL, default_cache_path, read_schema
+
+
+def comma_list(value:str) -> list[str]:
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def main(argv:list[str]|None = None) -> int:
+    defaults = Options ()
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tdlib2vala',
+        description='Generate Vala bindings for TDLib from td_api.tl'
+    )
+    parser.add_argument('schema', nargs='?', default=TD_API_URL, help='td_api.tl path or url (default: TDLib master)')
+    parser.add_argument('-o', '--output', required=True, help='project directory, sources go to OUTPUT/lib and OUTPUT/vapi')
+    parser.add_argument('--namespace', default=defaults.namespace)
+    parser.add_argument('--author', default=defaults.author, help='author in the license header')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='render processes, 1 renders in this process')
+    parser.add_argument('--cache-dir', default=default_cache_path(), help='downloaded and parsed schema cache (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='don\'t read or write the parsed schema cache')
+    parser.add_argument('--offline', action='store_true', help='use the last downloaded schema instead of fetching the url')
+
+    features = parser.add_argument_group('features')
+    features.add_argument('--static-serializers', action=argparse.BooleanOptionalAction, default=defaults.static_serializers, help='generate to_json () instead of reflection')
+    features.add_argument('--static-deserializers', action=argparse.BooleanOptionalAction, default=defaults.static_deserializers, help='generate from_json () instead of reflection')
+    features.add_argument('--lazy-type-registration', action=argparse.BooleanOptionalAction, default=defaults.lazy_type_registration, help='register object types on first use')
+    features.add_argument('--functions', type=comma_list, help='comma separated functions to generate, with the types they need (default: all)')
+    features.add_argument('--updates', type=comma_list, help='comma separated Update constructors to generate (default: all)')
+    features.add_argument('--instrumentation', action=argparse.BooleanOptionalAction, default=defaults.instrumentation, help='generate TDLib.Stats with request latencies, parse time, queue depth and update rates')
+    features.add_argument('--update-signals', action=argparse.BooleanOptionalAction, default=defaults.update_signals, help='generate a typed signal per update type and skip deserializing updates nobody listens to')
+    features.add_argument('--update-batch-window', type=int, default=defaults.update_batch_window, metavar='MS', help='deliver updates only through Client.updates_received, in batches collected for MS milliseconds; update_recieved and update signals are not emitted. 0 disables batching')
+    features.add_argument('--coalesced-updates', type=comma_list, default=defaults.coalesced_updates, help='comma separated Update constructors of which only the latest per object is delivered in a batch (default: %(default)s)')
+    features.add_argument('--compact-objects', action=argparse.BooleanOptionalAction, default=defaults.compact_objects, help='generate objects with plain fields and arrays instead of properties, needs static (de)serializers')
+    features.add_argument('--string-interning', action=argparse.BooleanOptionalAction, default=defaults.string_interning, help='share @type and repeated string field values between objects')
+    features.add_argument('--interned-fields', type=comma_list, default=defaults.interned_fields, help='comma separated json names of interned string fields (default: %(default)s)')
+    features.add_argument('--client-shards', type=int, default=defaults.client_shards, help='split Client methods into N partial class files (needs valac with partial classes)')
+
+    args = parser.parse_args(argv)
+
+    options = Options (
+        author=args.author,
+        namespace=args.namespace,
+        static_serializers=args.static_serializers,
+        static_deserializers=args.static_deserializers,
+        lazy_type_registration=args.lazy_type_registration,
+        functions=args.functions,
+        updates=args.updates,
+        client_shards=args.client_shards,
+        instrumentation=args.instrumentation,
+        update_signals=args.update_signals,
+        update_batch_window=args.update_batch_window,
+        coalesced_updates=args.coalesced_updates,
+        compact_objects=args.compact_objects,
+        string_interning=args.string_interning,
+        interned_fields=args.interned_fields
+    )
+
+    try:
+        td_api_text = read_schema(args.schema, args.cache_dir, args.offline)
+        output = generate(td_api_text, args.output, options, args.jobs, None if args.no_cache else args.cache_dir)
+    except (OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+
+    for path in output.removed_paths:
+        print(f'Removed {path}')
+    print(f'{len(output.changed_paths)} files changed')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import importlib.util
+import os
+import sys
+
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Vendored td_api.tl the benchmarks run on, so numbers stay comparable
+# between runs and machines. benchmarks/fetch_schema.py replaces it with
+# TD_API_URL after TD_API_COMMIT is bumped.
+TD_API_VERSION = '1.8.29'
+TD_API_COMMIT = '44b548c3075818af24409f561bd0390a84d3a727'
+TD_API_URL = f'https://raw.githubusercontent.com/tdlib/td/{TD_API_COMMIT}/td/generate/scheme/td_api.tl'
+SCHEMA_PATH = os.path.join(ROOT_PATH, 'benchmarks', 'td_api.tl')
+# Hand-written excerpt for quick runs, not representative of the real size
+EXCERPT_PATH = os.path.join(ROOT_PATH, 'benchmarks', 'td_api_excerpt.tl')
+
+
+def import_package():
+    '''
+    Import the generator as the tdlib2vala package whatever
+    the checkout directory is called.
+    '''
+    if 'tdlib2vala' in sys.modules:
+        return sys.modules['tdlib2vala']
+
+    spec = importlib.util.spec_from_file_location(
+        'tdlib2vala',
+        os.path.join(ROOT_PATH, '__init__.py'),
+        submodule_search_locations=[ROOT_PATH]
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules['tdlib2vala'] = package
+    spec.loader.exec_module(package)
+
+    return package
+
+
+def read_benchmark_schema(schema_path:str|None, quick:bool) -> str:
+    '''
+    Text of the schema to benchmark: schema_path if given, the excerpt
+    with quick, and the vendored td_api.tl snapshot otherwise.
+    '''
+    if schema_path is None:
+        schema_path = EXCERPT_PATH if quick else SCHEMA_PATH
+
+    with open(schema_path) as file:
+        return file.read()
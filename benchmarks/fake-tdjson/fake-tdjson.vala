@@ -0,0 +1,241 @@
+/*
+ * Copyright (C) 2024 Vladimir Vaskov
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program. If not, see <https://www.gnu.org/licenses/>.
+ *
+ * SPDX-License-Identifier: GPL-3.0-or-later
+ */
+
+/*
+ * Stand-in for libtdjson: td_create_client_id, td_send, td_receive and
+ * td_execute answer from canned responses, so the generated bindings can
+ * be benchmarked without TDLib and network. Responses get the request
+ * @extra and @client_id and are delivered after a configurable latency,
+ * updates are replayed at a configurable rate.
+ *
+ * Replay files are json lines:
+ *
+ *   {"request": "getOption", "response": {"@type": "optionValueString", "value": "1.8.0"}}
+ *   {"update": {"@type": "updateOption", "name": "version", "value": {...}}}
+ */
+
+namespace FakeTDJson {
+
+    [Compact]
+    class Message {
+        public string json;
+        public int64 due_time;
+
+        public Message (owned string json, int64 due_time) {
+            this.json = (owned) json;
+            this.due_time = due_time;
+        }
+    }
+
+    const string DEFAULT_RESPONSE = """{"@type":"ok"}""";
+
+    AsyncQueue<Message>? queue = null;
+
+    // Request @type -> response json
+    HashTable<string, string>? responses = null;
+
+    string[]? update_templates = null;
+    string[]? updates = null;
+
+    int64 latency = 0;
+    int64 update_interval = 0;
+    int64 next_update_time = 0;
+    int updates_left = 0;
+    int next_update = 0;
+
+    int last_client_id = 0;
+
+    // Strings returned by td_receive and td_execute live until the next call, like in TDLib
+    string? last_received = null;
+    string? last_executed = null;
+
+    /**
+     * Reset the fake, must be called before the first client is created
+     *
+     * @param latency_us    delay of every response, microseconds
+     */
+    public void setup (int64 latency_us = 0) {
+        queue = new AsyncQueue<Message> ();
+        responses = new HashTable<string, string> (str_hash, str_equal);
+        update_templates = {};
+        updates = {};
+        latency = latency_us;
+        updates_left = 0;
+
+        add_response ("getOption", """{"@type":"optionValueString","value":"1.8.0-fake"}""");
+    }
+
+    public void add_response (string request_type, string response_json) {
+        responses.insert (request_type, response_json);
+    }
+
+    public void add_update (string update_json) {
+        update_templates += update_json;
+    }
+
+    public void load_replay (string path) throws Error {
+        var stream = new DataInputStream (File.new_for_path (path).read ());
+        var generator = new Json.Generator ();
+
+        string? line;
+        while ((line = stream.read_line_utf8 ()) != null) {
+            if (line.strip () == "") {
+                continue;
+            }
+
+            var node = Json.from_string (line);
+            unowned Json.Object record = node.get_object ();
+
+            if (record.has_member ("update")) {
+                generator.set_root (record.get_member ("update"));
+                add_update (generator.to_data (null));
+
+            } else {
+                generator.set_root (record.get_member ("response"));
+                add_response (record.get_string_member ("request"), generator.to_data (null));
+            }
+        }
+    }
+
+    /**
+     * Start replaying added updates for the client, in a loop
+     *
+     * @param client_id     receiver of updates
+     * @param count         number of updates to send
+     * @param per_second    update rate, 0 sends them back to back
+     */
+    public void start_updates (int client_id, int count, double per_second) {
+        return_if_fail (update_templates.length > 0);
+
+        updates = {};
+        foreach (unowned string update in update_templates) {
+            updates += with_members (update, null, client_id);
+        }
+
+        update_interval = per_second > 0 ? (int64) (1000000 / per_second) : 0;
+        next_update_time = get_monotonic_time ();
+        next_update = 0;
+        AtomicInt.set (ref updates_left, count);
+    }
+
+    // Add @extra and @client_id without reparsing the response
+    string with_members (string json, string? extra, int client_id) {
+        var builder = new StringBuilder.sized (json.length + 48);
+        builder.append_len (json, json.last_index_of_char ('}'));
+
+        if (extra != null) {
+            builder.append (",\"@extra\":");
+            builder.append (extra);
+        }
+
+        builder.append_printf (",\"@client_id\":%d}", client_id);
+
+        return builder.str;
+    }
+
+    // Value of a top level string or number member, requests come from TDJsoner so no full parse is needed
+    string? member_value (string json, string name) {
+        int start = json.index_of ("\"%s\":".printf (name));
+        if (start < 0) {
+            return null;
+        }
+
+        start += name.length + 3;
+
+        if (json[start] == '"') {
+            start++;
+            return json.substring (start, json.index_of_char ('"', start) - start);
+        }
+
+        int end = start;
+        while (json[end].isdigit () || json[end] == '-') {
+            end++;
+        }
+
+        return json.substring (start, end - start);
+    }
+
+    unowned string response_for (string request) {
+        string? request_type = member_value (request, "@type");
+        unowned string? response = request_type != null ? responses.lookup (request_type) : null;
+
+        return response ?? DEFAULT_RESPONSE;
+    }
+
+    [CCode (cname = "td_create_client_id")]
+    public int create_client_id () {
+        return AtomicInt.add (ref last_client_id, 1) + 1;
+    }
+
+    [CCode (cname = "td_send")]
+    public void send (int client_id, string request) {
+        queue.push (new Message (
+            with_members (response_for (request), member_value (request, "@extra"), client_id),
+            get_monotonic_time () + latency
+        ));
+    }
+
+    [CCode (cname = "td_receive")]
+    public unowned string? receive (double timeout) {
+        int64 now = get_monotonic_time ();
+        int64 deadline = now + (int64) (timeout * 1000000);
+
+        if (AtomicInt.get (ref updates_left) > 0) {
+            if (next_update_time <= now && queue.length () == 0) {
+                return pop_update ();
+            }
+
+            deadline = int64.min (deadline, next_update_time);
+        }
+
+        Message? message = deadline > now ? queue.timeout_pop ((uint64) (deadline - now)) : queue.try_pop ();
+
+        if (message == null) {
+            if (AtomicInt.get (ref updates_left) > 0 && next_update_time <= get_monotonic_time ()) {
+                return pop_update ();
+            }
+
+            return null;
+        }
+
+        // Latency is the same for every message, so the queue is ordered by due time
+        int64 wait = message.due_time - get_monotonic_time ();
+        if (wait > 0) {
+            Thread.usleep ((ulong) wait);
+        }
+
+        last_received = (owned) message.json;
+        return last_received;
+    }
+
+    unowned string pop_update () {
+        last_received = updates[next_update];
+        next_update = (next_update + 1) % updates.length;
+        next_update_time += update_interval;
+        AtomicInt.dec_and_test (ref updates_left);
+
+        return last_received;
+    }
+
+    [CCode (cname = "td_execute")]
+    public unowned string? execute (string request) {
+        last_executed = response_for (request);
+        return last_executed;
+    }
+}
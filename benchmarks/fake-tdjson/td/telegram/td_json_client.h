@@ -0,0 +1,36 @@
+/*
+ * Copyright (C) 2024 Vladimir Vaskov
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program. If not, see <https://www.gnu.org/licenses/>.
+ *
+ * SPDX-License-Identifier: GPL-3.0-or-later
+ */
+
+/*
+ * The part of TDLib td_json_client.h used by the bindings, implemented
+ * by fake-tdjson.vala for benchmarks.
+ */
+
+#ifndef FAKE_TD_JSON_CLIENT_H
+#define FAKE_TD_JSON_CLIENT_H
+
+int td_create_client_id (void);
+
+void td_send (int client_id, const char *request);
+
+const char *td_receive (double timeout);
+
+const char *td_execute (const char *request);
+
+#endif
@@ -1,3 +1,4 @@
+#!/usr/bin/python3
 # Copyright (C) 2024 Vladimir Vaskov
 #
 # This program is free software: you can redistribute it and/or modify
@@ -15,6 +16,30 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-author:str
-namespace:str
-target_path:str
+# Replace the vendored benchmarks/td_api.tl with the pinned upstream one:
+#
+#   python3 benchmarks/fetch_schema.py
+#
+# Only needed to move the benchmarks to another TDLib: bump TD_API_VERSION
+# and TD_API_COMMIT in benchmarks/common.py, run it and commit the result.
+
+import requests
+
+from common import SCHEMA_PATH, TD_API_URL, TD_API_VERSION
+
+
+DOWNLOAD_TIMEOUT = 30
+
+
+def main():
+    response = requests.get(TD_API_URL, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+
+    with open(SCHEMA_PATH, 'w') as file:
+        file.write(response.text)
+
+    print(f'td_api.tl {TD_API_VERSION} saved to {SCHEMA_PATH}')
+
+
+if __name__ == '__main__':
+    main()
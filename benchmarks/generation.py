@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Generator throughput by stage: parse, escape_names, render and write,
+# on a td_api.tl and on synthetic copies of it scaled by each factor.
+#
+#   python3 benchmarks/generation.py [--schema td_api.tl | --quick] [--jobs N] [factor ...]
+#
+# Without --schema the vendored benchmarks/td_api.tl snapshot (TDLib 1.8.29)
+# is used, --quick runs on the small benchmarks/td_api_excerpt.tl instead.
+# Wall time is the best of several runs, peak memory is measured by
+# tracemalloc in a separate run, so tracing doesn't skew the timings.
+
+import argparse
+import copy
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from common import read_benchmark_schema
+from synthetic import scale_schema
+from tdlib2vala.emit import collect_tasks, render_all
+from tdlib2vala.generator import escape_names
+from tdlib2vala.options import Options
+from tdlib2vala.output import Output
+from tdlib2vala.tl_parser import parse_schema
+
+
+REPEATS = 3
+
+
+class StageResult ():
+    name:str
+    wall:float
+    peak:int
+    files:int
+
+    def __init__(self, name:str, wall:float, peak:int, files:int = 0):
+        self.name = name
+        self.wall = wall
+        self.peak = peak
+        self.files = files
+
+
+def measure(run, prepare = lambda: None) -> tuple[float, int]:
+    '''
+    Best wall time of run (prepare isn't timed) and its tracemalloc peak.
+    '''
+    best = float('inf')
+
+    for _ in range(REPEATS):
+        state = prepare()
+        start = time.perf_counter()
+        run(state)
+        best = min(best, time.perf_counter() - start)
+
+    state = prepare()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+
+def write_files(files:list[tuple[str, str]], target_path:str):
+    output = Output ()
+    for path, content in files:
+        output.write_if_changed(os.path.join(target_path, path), content)
+
+
+def bench_schema(td_api_text:str, options:Options, jobs:int) -> list[StageResult]:
+    results = []
+
+    wall, peak = measure(lambda _: parse_schema(td_api_text))
+    results.append(StageResult('parse', wall, peak))
+
+    class_datas, func_datas = parse_schema(td_api_text)
+
+    wall, peak = measure(
+        lambda datas: escape_names(*datas),
+        lambda: copy.deepcopy((class_datas, func_datas))
+    )
+    results.append(StageResult('escape', wall, peak))
+
+    escape_names(class_datas, func_datas)
+    tasks = collect_tasks(class_datas, func_datas, '', options)
+
+    wall, peak = measure(lambda _: render_all(tasks, jobs))
+    results.append(StageResult('render', wall, peak, len(tasks)))
+
+    # Relative paths, so every write goes to a fresh directory
+    files = [(path.lstrip(os.sep), content) for path, content in render_all(tasks, jobs)]
+    temp_path = tempfile.mkdtemp(prefix='tdlib2vala-bench-')
+
+    try:
+        def fresh_dir():
+            shutil.rmtree(temp_path)
+            os.mkdir(temp_path)
+
+        wall, peak = measure(lambda _: write_files(files, temp_path), fresh_dir)
+        results.append(StageResult('write', wall, peak, len(files)))
+
+        # Second run over the same tree: only comparisons, nothing changed
+        wall, peak = measure(lambda _: write_files(files, temp_path))
+        results.append(StageResult('rewrite', wall, peak, len(files)))
+    finally:
+        shutil.rmtree(temp_path)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generator benchmarks by stage')
+    parser.add_argument('factors', nargs='*', type=int, default=[1, 10, 100], help='synthetic schema sizes, in copies of the schema')
+    parser.add_argument('--schema', help='td_api.tl to scale (default: vendored snapshot)')
+    parser.add_argument('--quick', action='store_true', help='use the small td_api.tl excerpt')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='render processes')
+    args = parser.parse_args()
+
+    td_api_text = read_benchmark_schema(args.schema, args.quick)
+
+    options = Options ()
+
+    print(f'{"factor":>6} {"stage":>8} {"wall, ms":>10} {"peak, KiB":>10} {"files":>7} {"files/s":>9}')
+
+    for factor in args.factors:
+        for result in bench_schema(scale_schema(td_api_text, factor), options, args.jobs):
+            files_per_second = f'{result.files / result.wall:>9.0f}' if result.files else f'{"":>9}'
+            print(f'{factor:>6} {result.name:>8} {result.wall * 1000:>10.2f} {result.peak / 1024:>10.0f} {result.files or "":>7} {files_per_second}')
+
+
+if __name__ == '__main__':
+    main()
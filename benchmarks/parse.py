@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# td_api.tl parse time on the given schema and on synthetic copies of it:
+#
+#   python3 benchmarks/parse.py [--schema td_api.tl | --quick] [factor ...]
+#
+# The schema defaults to the real td_api.tl, the vendored benchmarks/td_api.tl
+# snapshot of TDLib 1.8.29, so the default run needs no download. --quick
+# runs on the small benchmarks/td_api_excerpt.tl. Factors default to 1 10 100.
+
+import argparse
+import time
+
+from common import read_benchmark_schema
+from synthetic import scale_schema
+from tdlib2vala.tl_parser import parse_schema
+
+
+REPEATS = 5
+
+
+def bench(td_api_text:str) -> tuple[float, int, int]:
+    best = float('inf')
+
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        class_datas, func_datas = parse_schema(td_api_text)
+        best = min(best, time.perf_counter() - start)
+
+    return best, len(class_datas), len(func_datas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='td_api.tl parse benchmark')
+    parser.add_argument('factors', nargs='*', type=int, default=[1, 10, 100], help='synthetic schema sizes, in copies of the schema')
+    parser.add_argument('--schema', help='td_api.tl to scale (default: vendored snapshot)')
+    parser.add_argument('--quick', action='store_true', help='use the small td_api.tl excerpt')
+    args = parser.parse_args()
+
+    td_api_text = read_benchmark_schema(args.schema, args.quick)
+
+    print(f'{"factor":>6} {"lines":>9} {"classes":>8} {"functions":>9} {"best, ms":>10} {"lines/s":>11}')
+
+    for factor in args.factors:
+        text = scale_schema(td_api_text, factor)
+        lines = text.count('\n')
+        best, classes, functions = bench(text)
+
+        print(f'{factor:>6} {lines:>9} {classes:>8} {functions:>9} {best * 1000:>10.2f} {lines / best:>11.0f}')
+
+
+if __name__ == '__main__':
+    main()
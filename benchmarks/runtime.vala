@@ -0,0 +1,316 @@
+/*
+ * Copyright (C) 2024 Vladimir Vaskov
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program. If not, see <https://www.gnu.org/licenses/>.
+ *
+ * SPDX-License-Identifier: GPL-3.0-or-later
+ */
+
+/*
+ * Runtime benchmarks of the generated bindings against the fake tdjson:
+ * request round-trip latency, concurrent in-flight requests, update
+ * throughput, memory of retained updates and serialization cost per
+ * object type. Generate the bindings into OUTPUT and build it without
+ * libtdjson:
+ *
+ *   valac --pkg gio-2.0 --pkg json-glib-1.0 --pkg gee-0.8 \
+ *       --vapidir OUTPUT/vapi --pkg tdjson -X -Ibenchmarks/fake-tdjson \
+ *       [-D STATIC_DESERIALIZERS] [-D UPDATE_BATCHING] \
+ *       $(find OUTPUT/lib -name '*.vala') \
+ *       benchmarks/fake-tdjson/fake-tdjson.vala benchmarks/runtime.vala -o runtime
+ *
+ * Define STATIC_DESERIALIZERS when the bindings were generated with
+ * --static-deserializers, so objects are deserialized the same way the
+ * client does it. Define UPDATE_BATCHING when they were generated with
+ * --update-batch-window, batched updates come only with updates_received.
+ *
+ * To compare memory with and without --string-interning, build it against
+ * both generations and run each with the same recorded --replay stream.
+ */
+
+const string OPTION_JSON = """{"@type":"optionValueString","value":"1.8.0"}""";
+const string UPDATE_JSON = """{"@type":"updateOption","name":"version","value":{"@type":"optionValueString","value":"1.8.0"}}""";
+const string FORMATTED_TEXT_JSON = """{"@type":"formattedText","text":"Hello, world! https://example.com @user","entities":[{"@type":"textEntity","offset":14,"length":19,"type":{"@type":"textEntityTypeTextUrl","url":"https://example.com"}},{"@type":"textEntity","offset":34,"length":5,"type":{"@type":"textEntityTypeMention"}}]}""";
+
+int latency_us = 0;
+int requests = 10000;
+int in_flight = 1000;
+int update_count = 100000;
+double update_rate = 0;
+int retain_count = 100000;
+int serialize_repeats = 100000;
+string? replay_path = null;
+
+const OptionEntry[] OPTIONS = {
+    { "latency", 0, 0, OptionArg.INT, ref latency_us, "Fake response latency, microseconds", "US" },
+    { "requests", 0, 0, OptionArg.INT, ref requests, "Sequential requests for round-trip latency", "N" },
+    { "in-flight", 0, 0, OptionArg.INT, ref in_flight, "Requests sent at once", "N" },
+    { "updates", 0, 0, OptionArg.INT, ref update_count, "Updates to receive", "N" },
+    { "update-rate", 0, 0, OptionArg.DOUBLE, ref update_rate, "Updates per second, 0 is as fast as possible", "RATE" },
+    { "retain", 0, 0, OptionArg.INT, ref retain_count, "Updates kept alive for the memory benchmark", "N" },
+    { "serialize-repeats", 0, 0, OptionArg.INT, ref serialize_repeats, "Repeats per object type", "N" },
+    { "replay", 0, 0, OptionArg.FILENAME, ref replay_path, "Json lines with recorded responses and updates", "FILE" },
+    { null }
+};
+
+double percentile (Gee.List<double?> sorted, double p) {
+    return sorted[(int) ((sorted.size - 1) * p)];
+}
+
+async void bench_round_trip (TDLib.Client client) throws TDLib.TDLibError {
+    var latencies = new Gee.ArrayList<double?> ();
+
+    for (int i = 0; i < requests; i++) {
+        int64 start = get_monotonic_time ();
+        yield client.get_option ("version");
+        latencies.add ((get_monotonic_time () - start) / 1000.0);
+    }
+
+    double sum = 0;
+    foreach (double latency in latencies) {
+        sum += latency;
+    }
+
+    latencies.sort ((a, b) => {
+        double x = a;
+        double y = b;
+        return x < y ? -1 : (x > y ? 1 : 0);
+    });
+
+    print ("round trip, %d requests:    mean %.3f ms, p50 %.3f ms, p99 %.3f ms, max %.3f ms\n",
+        requests,
+        sum / requests,
+        percentile (latencies, 0.5),
+        percentile (latencies, 0.99),
+        percentile (latencies, 1.0)
+    );
+}
+
+async void bench_in_flight (TDLib.Client client) {
+    int pending = in_flight;
+    int failed = 0;
+    int64 start = get_monotonic_time ();
+
+    for (int i = 0; i < in_flight; i++) {
+        client.get_option.begin ("version", (obj, res) => {
+            try {
+                client.get_option.end (res);
+            } catch (TDLib.TDLibError e) {
+                failed++;
+            }
+
+            if (--pending == 0) {
+                bench_in_flight.callback ();
+            }
+        });
+    }
+
+    yield;
+
+    double seconds = (get_monotonic_time () - start) / 1000000.0;
+
+    print ("in flight, %d requests:     %.3f ms total, %.0f requests/s, %d failed\n",
+        in_flight,
+        seconds * 1000,
+        in_flight / seconds,
+        failed
+    );
+}
+
+async void bench_updates (TDLib.Client client) {
+    int received = 0;
+    int64 start = 0;
+
+#if UPDATE_BATCHING
+    ulong handler = client.updates_received.connect ((updates) => {
+        received += updates.length;
+        if (received >= update_count) {
+            bench_updates.callback ();
+        }
+    });
+#else
+    ulong handler = client.update_recieved.connect ((update) => {
+        if (++received == update_count) {
+            bench_updates.callback ();
+        }
+    });
+#endif
+
+    start = get_monotonic_time ();
+    FakeTDJson.start_updates (client.client_id, update_count, update_rate);
+
+    yield;
+
+    double seconds = (get_monotonic_time () - start) / 1000000.0;
+    client.disconnect (handler);
+
+    print ("updates, %d received:       %.3f ms total, %.0f updates/s\n",
+        update_count,
+        seconds * 1000,
+        update_count / seconds
+    );
+}
+
+/*
+ * Resident set size from /proc, 0 where it isn't available
+ */
+int64 resident_kb () {
+    string status;
+
+    try {
+        FileUtils.get_contents ("/proc/self/status", out status);
+
+    } catch (FileError e) {
+        return 0;
+    }
+
+    foreach (unowned string line in status.split ("\n")) {
+        if (line.has_prefix ("VmRSS:")) {
+            return int64.parse (line.substring ("VmRSS:".length).strip ());
+        }
+    }
+
+    return 0;
+}
+
+async void bench_retained_updates (TDLib.Client client) {
+    var retained = new Gee.ArrayList<TDLib.Update> ();
+    int64 start_kb = resident_kb ();
+
+#if UPDATE_BATCHING
+    ulong handler = client.updates_received.connect ((updates) => {
+        foreach (var update in updates) {
+            retained.add (update);
+        }
+
+        if (retained.size >= retain_count) {
+            bench_retained_updates.callback ();
+        }
+    });
+#else
+    ulong handler = client.update_recieved.connect ((update) => {
+        retained.add (update);
+
+        if (retained.size == retain_count) {
+            bench_retained_updates.callback ();
+        }
+    });
+#endif
+
+    FakeTDJson.start_updates (client.client_id, retain_count, 0);
+
+    yield;
+
+    client.disconnect (handler);
+
+    int64 retained_kb = resident_kb () - start_kb;
+
+    print ("retained, %d updates:      %.1f MiB resident, %.0f bytes/update\n",
+        retain_count,
+        retained_kb / 1024.0,
+        retained_kb * 1024.0 / retain_count
+    );
+}
+
+Object deserialize (string json) throws TDLib.JsonError {
+    var jsoner = new TDLib.TDJsoner (json, null, TDLib.Case.SNAKE);
+
+#if STATIC_DESERIALIZERS
+    return jsoner.fill_streamed (TDLib.deserialize_any (jsoner.root.get_object ()));
+#else
+    return jsoner.deserialize_object (null);
+#endif
+}
+
+void bench_serialization (string name, string json) throws TDLib.JsonError {
+    int64 start = get_monotonic_time ();
+
+    Object? obj = null;
+    for (int i = 0; i < serialize_repeats; i++) {
+        obj = deserialize (json);
+    }
+
+    double deserialize_ns = (get_monotonic_time () - start) * 1000.0 / serialize_repeats;
+
+    start = get_monotonic_time ();
+
+    for (int i = 0; i < serialize_repeats; i++) {
+        TDLib.TDJsoner.serialize (obj, TDLib.Case.SNAKE);
+    }
+
+    double serialize_ns = (get_monotonic_time () - start) * 1000.0 / serialize_repeats;
+
+    print ("%-20s deserialize %8.0f ns, serialize %8.0f ns\n", name, deserialize_ns, serialize_ns);
+}
+
+async int run () {
+    var client = new TDLib.Client ();
+
+    try {
+        client.init ();
+
+        yield bench_round_trip (client);
+        yield bench_in_flight (client);
+        yield bench_updates (client);
+        yield bench_retained_updates (client);
+
+        bench_serialization ("OptionValueString", OPTION_JSON);
+        bench_serialization ("UpdateOption", UPDATE_JSON);
+        bench_serialization ("FormattedText", FORMATTED_TEXT_JSON);
+
+    } catch (Error e) {
+        printerr ("%s\n", e.message);
+        return 1;
+    }
+
+    return 0;
+}
+
+int main (string[] args) {
+    try {
+        var context = new OptionContext ("- generated bindings runtime benchmarks");
+        context.add_main_entries (OPTIONS, null);
+        context.parse (ref args);
+
+    } catch (OptionError e) {
+        printerr ("%s\n", e.message);
+        return 1;
+    }
+
+    FakeTDJson.setup (latency_us);
+
+    if (replay_path != null) {
+        try {
+            FakeTDJson.load_replay (replay_path);
+
+        } catch (Error e) {
+            printerr ("%s\n", e.message);
+            return 1;
+        }
+    } else {
+        FakeTDJson.add_update (UPDATE_JSON);
+    }
+
+    var loop = new MainLoop ();
+    int status = 0;
+
+    run.begin ((obj, res) => {
+        status = run.end (res);
+        loop.quit ();
+    });
+
+    loop.run ();
+
+    return status;
+}
@@ -0,0 +1,62 @@
+/*
+ * Copyright (C) 2024 Vladimir Vaskov
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program. If not, see <https://www.gnu.org/licenses/>.
+ *
+ * SPDX-License-Identifier: GPL-3.0-or-later
+ */
+
+/*
+ * Startup cost of the generated bindings: first Client instantiation and
+ * first update deserialization. Generate the bindings into OUTPUT, once
+ * with --lazy-type-registration and once with --no-lazy-type-registration,
+ * build each against the fake tdjson, so TDLib startup isn't timed, and
+ * compare:
+ *
+ *   valac --pkg gio-2.0 --pkg json-glib-1.0 --pkg gee-0.8 \
+ *       --vapidir OUTPUT/vapi --pkg tdjson -X -Ibenchmarks/fake-tdjson \
+ *       $(find OUTPUT/lib -name '*.vala') \
+ *       benchmarks/fake-tdjson/fake-tdjson.vala benchmarks/startup.vala -o startup
+ *
+ * Every run must be a fresh process, type registration happens once.
+ */
+
+const string UPDATE_JSON = """{"@type":"updateOption","name":"version","value":{"@type":"optionValueString","value":"1.8.0"}}""";
+
+int main (string[] args) {
+    FakeTDJson.setup ();
+
+    var timer = new Timer ();
+
+    var client = new TDLib.Client ();
+    double client_time = timer.elapsed ();
+
+    timer.start ();
+
+    try {
+        var jsoner = new TDLib.TDJsoner (UPDATE_JSON, null, TDLib.Case.SNAKE);
+        jsoner.deserialize_object (null);
+
+    } catch (TDLib.JsonError e) {
+        printerr ("%s\n", e.message);
+        return 1;
+    }
+
+    double update_time = timer.elapsed ();
+
+    print ("first Client:              %.3f ms\n", client_time * 1000);
+    print ("first update deserialize:  %.3f ms\n", update_time * 1000);
+
+    return 0;
+}
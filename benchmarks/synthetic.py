@@ -0,0 +1,61 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import re
+
+from common import import_package
+
+import_package()
+
+from tdlib2vala.tl_parser import FUNCTIONS_SEPARATOR, parse_schema
+
+
+WORD_RE = re.compile(r'\b[a-zA-Z]\w*\b')
+
+
+def scale_schema(td_api_text:str, factor:int) -> str:
+    '''
+    Make a schema `factor` times bigger than td_api_text: types and functions
+    are repeated with every class, constructor and function renamed,
+    so the copies are distinct types, not overwritten dict entries.
+    '''
+    class_datas, func_datas = parse_schema(td_api_text)
+
+    names = set(class_datas) | set(func_datas)
+    for class_data in class_datas.values():
+        names.update(class_data.constructors)
+
+    first_comment = td_api_text.index('//')
+    separator = td_api_text.index(FUNCTIONS_SEPARATOR)
+
+    preamble = td_api_text[:first_comment]
+    types = td_api_text[first_comment:separator]
+    functions = td_api_text[separator + len(FUNCTIONS_SEPARATOR):]
+
+    def renamed(text:str, copy:int) -> str:
+        if copy == 0:
+            return text
+
+        suffix = f'Copy{copy}'
+        return WORD_RE.sub(lambda m: m.group() + suffix if m.group() in names else m.group(), text)
+
+    return ''.join([
+        preamble,
+        *(renamed(types, copy) for copy in range(factor)),
+        FUNCTIONS_SEPARATOR,
+        *(renamed(functions, copy) for copy in range(factor)),
+    ])
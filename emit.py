@@ -0,0 +1,110 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+from .functions_defs import client_shard, render_client_shard, render_functions
+from .object_defs import render_func_object, render_object, render_td_object
+from .options import Options
+from .output import Output
+from .req_manager import render_req_manager
+from .utils import ClassData, FuncData, pascal_to_kebeb, snake_to_kebab
+
+
+# (path, render function, render args)
+RenderTask = tuple[str, Callable[..., str], tuple]
+
+
+def collect_tasks(class_datas:dict[str,ClassData], func_datas:dict[str,FuncData], target_path:str, options:Options) -> list[RenderTask]:
+    objects_path = os.path.join(target_path, 'objects')
+
+    tasks:list[RenderTask] = []
+
+    for class_data in class_datas.values():
+        tasks.append((
+            os.path.join(objects_path, pascal_to_kebeb(class_data.name) + '.vala'),
+            render_object,
+            (class_data, options)
+        ))
+    tasks.append((
+        os.path.join(objects_path, 't-d-object.vala'),
+        render_td_object,
+        (options,)
+    ))
+    for func_data in func_datas.values():
+        tasks.append((
+            os.path.join(objects_path, snake_to_kebab(func_data.name) + '.vala'),
+            render_func_object,
+            (func_data, options)
+        ))
+    tasks.append((
+        os.path.join(target_path, 'client.vala'),
+        render_functions,
+        (list(func_datas.values()), class_datas, options)
+    ))
+    if options.client_shards > 1:
+        shards:list[list[FuncData]] = [[] for _ in range(options.client_shards)]
+        for func_data in func_datas.values():
+            shards[client_shard(func_data, options.client_shards)].append(func_data)
+
+        for i, shard in enumerate(shards):
+            tasks.append((
+                os.path.join(target_path, 'client', f'client-{i}.vala'),
+                render_client_shard,
+                (shard, options)
+            ))
+    tasks.append((
+        os.path.join(target_path, 'requests-manager.vala'),
+        render_req_manager,
+        (class_datas, options)
+    ))
+
+    return tasks
+
+
+def render_task(task:RenderTask) -> tuple[str, str]:
+    path, render, render_args = task
+    return path, render(*render_args)
+
+
+def render_all(tasks:list[RenderTask], jobs:int) -> list[tuple[str, str]]:
+    '''
+    Render all files to text, on a process pool if jobs > 1.
+    Options travel with every task, so workers need no shared state.
+    '''
+    if jobs <= 1 or len(tasks) < 2:
+        return [render_task(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // (jobs * 4))
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(render_task, tasks, chunksize=chunksize))
+
+
+def write_all(files:list[tuple[str, str]], output:Output) -> int:
+    '''
+    Write rendered files, returns the number of files actually changed.
+    '''
+    changed = 0
+
+    for path, content in files:
+        if output.write_if_changed(path, content):
+            changed += 1
+
+    return changed
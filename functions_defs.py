@@ -1,26 +1,22 @@
-import os
-import global_args
-from structures import CASE, CLIENT_CONSTR, CLIENT_FINAL, PROPERTY, REGULAR_PROPERTY, SYNC_BODY, BODY, CLIENT_CLASS, CLIENT_ID, INIT_BODY, METHOD, REQ_MANAGER
-from utils import ClassData, FuncData, camel_to_pascal, format_args_const, format_args_desc, format_description, format_header, format_init_method, format_method, snake_to_pascal
+import io
+import zlib
+from .options import Options
+from .structures import CLIENT_CONSTR, CLIENT_FINAL, INSTRUMENT_REQUEST_END, INSTRUMENT_REQUEST_START, PROPERTY, REGULAR_PROPERTY, SYNC_BODY, BODY, CLIENT_CLASS, CLIENT_ID, CLIENT_PARTIAL_CLASS, CLIENT_SHARD_CLASS, EMIT_CASE, INIT_BODY, METHOD, REQ_MANAGER, SUBSCRIBED_CASE, UPDATE_SIGNAL, UPDATE_SUBSCRIPTIONS, UPDATES_RECEIVED_SIGNAL
+from .utils import ClassData, FuncData, camel_to_kebeb, camel_to_pascal, camel_to_snake, format_args_const, format_args_desc, format_description, format_deserialize, format_header, format_init_method, format_method, snake_to_pascal
 
 
-def create_functions(func_datas:list[FuncData], class_datas:dict[str,ClassData]):
-    path = os.path.join(global_args.target_path, 'client.vala')
-
-    if not os.path.exists(global_args.target_path):
-        os.makedirs(global_args.target_path)
-        
+def render_functions(func_datas:list[FuncData], class_datas:dict[str,ClassData], options:Options) -> str:
     all_constructors = []
     for class_data in class_datas.values():
         for constructor in class_data.constructors.values():
             all_constructors.append(constructor.name)
 
-    with open(path, 'w') as file:
-        file.write(format_header())
+    with io.StringIO() as file:
+        file.write(format_header(options.author))
         file.write('\n\n')
         
-        file.write((CLIENT_CLASS + ' {{\n').format(
-            namespace=global_args.namespace
+        file.write(((CLIENT_CLASS if options.client_shards <= 1 else CLIENT_PARTIAL_CLASS) + ' {{\n').format(
+            namespace=options.namespace
         ))
 
         file.write('\n')
@@ -41,57 +37,81 @@ def create_functions(func_datas:list[FuncData], class_datas:dict[str,ClassData])
             ''
         ))
         file.write('    public signal void update_recieved (Update update);')
+        if options.update_batch_window > 0:
+            file.write('\n\n')
+            file.write(format_description(['Updates collected during the batch window, in the order they came. Emitted instead of update_recieved']))
+            file.write('\n')
+            file.write(UPDATES_RECEIVED_SIGNAL)
+        if options.update_signals:
+            write_update_signals(file, class_datas['Update'])
 
         file.write('\n')
         file.write(format_description(['@param timeout']))
         file.write(CLIENT_CONSTR);
         file.write(CLIENT_FINAL);
         
-        file.write('\n')
-        file.write('    static construct {{\n        {0}\n    }}'.format(
-            '\n        '.join(list(map(lambda x: f'typeof ({camel_to_pascal(x)}).ensure ();', all_constructors)))
-        ))
-        file.write('\n')
+        if not options.lazy_type_registration:
+            file.write('\n')
+            file.write('    static construct {{\n        {0}\n    }}'.format(
+                '\n        '.join(list(map(lambda x: f'typeof ({camel_to_pascal(x)}).ensure ();', all_constructors)))
+            ))
+            file.write('\n')
         
         file.write('\n')
         file.write(format_description(['Init client: create request manager and set client_id']))
         file.write('\n')
         file.write(format_init_method())
         file.write('\n')
+        if options.update_signals:
+            file.write(format_update_subscriptions(class_datas['Update']))
 
-        for func_data in func_datas:
-            descrition = format_description(func_data.constructor.description + format_args_desc(list(func_data.constructor.args.values())))
-            body_args = ',\n            '.join(list(map(lambda x: x.name, func_data.constructor.args.values())))
-
-            target_obj = snake_to_pascal(func_data.name)
-            
-            constructors = list(map(lambda x: x.name, class_datas[func_data.return_type].constructors.values()))
-            cases = []
-            for constructor in constructors:
-                cases.append(CASE.format(
-                    return_type=camel_to_pascal(constructor),
-                    case=constructor,
-                ))
-
-            if func_data.can_be_sync:
-                file.write('\n')
-                file.write(descrition)
-                file.write('\n')
-                file.write(format_method(
-                    func_data.return_type,
-                    func_data.name,
-                    format_args_const(list(func_data.constructor.args.values())),
-                    SYNC_BODY.format(
-                        target_obj=target_obj,
-                        args='\n            ' + body_args + '\n        ' if body_args else '',
-                        return_type=func_data.return_type,
-                        func_name=func_data.name,
-                        cases='\n'.join(cases)
-                    ),
-                    False
-                ))
-                file.write('\n')
+        if options.client_shards <= 1:
+            write_methods(file, func_datas, options)
 
+        file.write('}\n')
+
+        return file.getvalue()
+
+def write_update_signals(file:io.StringIO, update_data:ClassData):
+    '''
+    A typed signal per Update constructor, e.g. update_new_message (UpdateNewMessage)
+    '''
+    for constructor in update_data.constructors.values():
+        file.write('\n\n')
+        file.write(format_description(constructor.description))
+        file.write('\n')
+        file.write(UPDATE_SIGNAL.format(
+            name=camel_to_snake(constructor.name),
+            type_=camel_to_pascal(constructor.name)
+        ))
+
+def format_update_subscriptions(update_data:ClassData) -> str:
+    subscribed_cases = []
+    emit_cases = []
+    for constructor in update_data.constructors.values():
+        subscribed_cases.append(SUBSCRIBED_CASE.format(
+            case=constructor.name,
+            signal_name=camel_to_kebeb(constructor.name)
+        ))
+        emit_cases.append(EMIT_CASE.format(
+            case=constructor.name,
+            name=camel_to_snake(constructor.name),
+            type_=camel_to_pascal(constructor.name)
+        ))
+
+    return UPDATE_SUBSCRIPTIONS.format(
+        subscribed_cases='\n'.join(subscribed_cases),
+        emit_cases='\n'.join(emit_cases)
+    )
+
+def write_methods(file:io.StringIO, func_datas:list[FuncData], options:Options):
+    for func_data in func_datas:
+        descrition = format_description(func_data.constructor.description + format_args_desc(list(func_data.constructor.args.values())))
+        body_args = ',\n            '.join(list(map(lambda x: x.name, func_data.constructor.args.values())))
+
+        target_obj = snake_to_pascal(func_data.name)
+
+        if func_data.can_be_sync:
             file.write('\n')
             file.write(descrition)
             file.write('\n')
@@ -99,15 +119,57 @@ def create_functions(func_datas:list[FuncData], class_datas:dict[str,ClassData])
                 func_data.return_type,
                 func_data.name,
                 format_args_const(list(func_data.constructor.args.values())),
-                BODY.format(
+                SYNC_BODY.format(
                     target_obj=target_obj,
                     args='\n            ' + body_args + '\n        ' if body_args else '',
                     return_type=func_data.return_type,
                     func_name=func_data.name,
-                    cases='\n'.join(cases)
+                    deserialize=format_deserialize(func_data.return_type, 'jsoner', options),
+                    request_start=INSTRUMENT_REQUEST_START if options.instrumentation else '',
+                    request_end=INSTRUMENT_REQUEST_END.format(func_name=func_data.name + '_sync') if options.instrumentation else ''
                 ),
-                True
+                False
             ))
             file.write('\n')
-            
+
+        file.write('\n')
+        file.write(descrition)
+        file.write('\n')
+        file.write(format_method(
+            func_data.return_type,
+            func_data.name,
+            format_args_const(list(func_data.constructor.args.values())),
+            BODY.format(
+                target_obj=target_obj,
+                args='\n            ' + body_args + '\n        ' if body_args else '',
+                return_type=func_data.return_type,
+                func_name=func_data.name,
+                deserialize=format_deserialize(func_data.return_type, 'pending_request.response', options),
+                request_start=INSTRUMENT_REQUEST_START if options.instrumentation else '',
+                request_end=INSTRUMENT_REQUEST_END.format(func_name=func_data.name) if options.instrumentation else ''
+            ),
+            True
+        ))
+        file.write('\n')
+
+def client_shard(func_data:FuncData, shards:int) -> int:
+    '''
+    Shard of a method. It depends only on the method name, so adding or
+    removing functions doesn't move others between shards.
+    '''
+    return zlib.crc32(func_data.name.encode()) % shards
+
+def render_client_shard(func_datas:list[FuncData], options:Options) -> str:
+    with io.StringIO() as file:
+        file.write(format_header(options.author))
+        file.write('\n\n')
+
+        file.write((CLIENT_SHARD_CLASS + ' {{\n').format(
+            namespace=options.namespace
+        ))
+
+        write_methods(file, func_datas, options)
+
         file.write('}\n')
+
+        return file.getvalue()
@@ -1,4 +1,3 @@
-#!/usr/bin/python3
 # Copyright (C) 2024 Vladimir Vaskov
 #
 # This program is free software: you can redistribute it and/or modify
@@ -17,251 +16,88 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import os
-import shutil
-import requests
-import sys
-from functions_defs import create_functions
-from object_defs import create_func_object, create_object, create_td_object
-from req_manager import create_req_manager
-from utils import ArgData, ConstructorData, ClassData, FuncData, camel_to_snake, escape_name, escape_name, resolve_type, types_conversion
 
-import global_args
+from .emit import collect_tasks, render_all, write_all
+from .options import Options
+from .output import Output
+from .schema_cache import load_parsed, save_parsed
+from .tl_parser import parse_schema
+from .tree_shake import shake
+from .utils import ClassData, FuncData, escape_name
 
 
-TAG_PREFIX = '@'
-COMMENT_PREFIX = '//'
-CLASS_TAG =  TAG_PREFIX + 'class'
-DESCRIPTION_TAG = TAG_PREFIX + 'description'
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
 
 
-# author = sys.argv[1]
-# target_path = sysys.argv[2]
-author = 'Vladimir Vaskov'
-target_path = '/home/rirusha/Projects/libvalagram'
-target_path_lib = os.path.join(target_path, 'lib')
-
-td_api_url = 'https://raw.githubusercontent.com/tdlib/td/refs/heads/master/td/generate/scheme/td_api.tl'
-namespace = 'TDLib'
-
-global_args.author = author
-global_args.namespace = namespace
-global_args.target_path = target_path_lib
-
-td_api_doc_lines = requests.get(td_api_url).text.split('\n')
-
-td_api_doc_lines_format:list[str] = []
-
-for td_api_doc_line in td_api_doc_lines:
-    if (td_api_doc_line and td_api_doc_line.strip() != ''):
-        td_api_doc_lines_format.append(td_api_doc_line.strip())
-
-is_start:bool = False
-is_finctions:bool = False
-class_datas:dict[str,ClassData] = {}
-func_datas:dict[str,FuncData] = {}
-
-last_constructor:ConstructorData = None
-last_description_entity = None
-
-for line in td_api_doc_lines_format:
-    if '---functions---' in line:
-        is_finctions = True
-        continue
-
-    if line.startswith(COMMENT_PREFIX) and not is_start:
-        is_start = True
-
-    if not is_finctions and is_start:
-        if line.startswith(COMMENT_PREFIX + CLASS_TAG):
-            class_data = ClassData ()
-
-            class_data.description.append(line.split(DESCRIPTION_TAG)[1].strip())
-            last_description_entity = class_data
-            class_data.name = line.split(DESCRIPTION_TAG)[0].strip().split(' ')[-1].strip()
-
-            class_datas[class_data.name] = class_data
-
-        elif line.startswith(COMMENT_PREFIX + DESCRIPTION_TAG):
-            last_constructor = ConstructorData ()
-            
-            for desc in line.split('@'):
-                if desc == COMMENT_PREFIX:
-                    continue
-                elif desc.startswith('description'):
-                    last_constructor.description.append(desc.replace('description', '').strip())
-                    last_description_entity = last_constructor
-                else:
-                    arg_data = ArgData ()
-
-                    if desc.startswith('param_'):
-                        arg_data.name = desc.split(' ')[0].strip().replace('param_', '')
-                    else:
-                        arg_data.name = desc.split(' ')[0].strip()
-
-                    desc_line = ' '.join(desc.split(' ')[1:]).strip()
-                    arg_data.nullable = 'may be null' in desc_line
-                    arg_data.description.append(desc_line)
-
-                    last_description_entity = arg_data
-
-                    last_constructor.args[arg_data.name] = arg_data
-
-        elif line.startswith(COMMENT_PREFIX + TAG_PREFIX):
-            arg_data = ArgData ()
-
-            if line.startswith(COMMENT_PREFIX + TAG_PREFIX + 'param_'):
-                arg_data.name = line.split(' ')[0].strip('/@').replace('param_', '')
-                desc_line = line.replace(COMMENT_PREFIX + TAG_PREFIX + 'param_' + arg_data.name, '').strip()
-            else:
-                arg_data.name = line.split(' ')[0].strip('/@')
-                desc_line = line.replace(COMMENT_PREFIX + TAG_PREFIX + arg_data.name, '').strip()
-                
-            
-            arg_data.nullable = 'may be null' in desc_line
-            arg_data.description.append(desc_line)
-
-            last_description_entity = arg_data
-
-            last_constructor.args[arg_data.name] = arg_data
-
-        elif line.startswith(COMMENT_PREFIX + '-'):
-            last_description_entity.description.append(line.replace(COMMENT_PREFIX + '-', '').strip())
-
-        else:
-            strs = line.rstrip(';').split(' ')
-            construct_name = strs[0]
-            class_name = strs[-1].strip()
-
-            if class_name.lower() == construct_name.lower():
-                class_data = ClassData ()
-
-                class_data.description.append('')
-                class_data.name = class_name
-
-                class_datas[class_name] = class_data
-
-            last_constructor.name = construct_name
-            class_datas[class_name].constructors[construct_name] = last_constructor
-
-            for arg in strs:
-                if arg == construct_name or arg == class_name or arg == '=':
-                    continue
-
-                try:
-                    arg_name, arg_type = arg.split(':')
-                except ValueError:
-                    print(arg)
-                    sys.exit(1)
-                    
-                if arg_name == 'type':
-                    last_constructor.args[arg_name].name = 'type_'
-
-                last_constructor.args[arg_name].type_ = resolve_type(arg_type)
-
-    elif is_finctions and is_start:
-        if line.startswith(COMMENT_PREFIX + DESCRIPTION_TAG):
-            last_constructor = ConstructorData ()
-            
-            for desc in line.split('@'):
-                if desc == COMMENT_PREFIX:
-                    continue
-                elif desc.startswith('description'):
-                    last_constructor.description.append(desc.replace('description', '').strip())
-                    last_description_entity = last_constructor
-                else:
-                    arg_data = ArgData ()
+def escape_names(class_datas:dict[str,ClassData], func_datas:dict[str,FuncData]):
+    for class_data in class_datas.values():
+        class_data.name = escape_name(class_data.name)
+    
+        for constructor in class_data.constructors.values():
+            for arg in constructor.args.values():
+                arg.name = escape_name(arg.name)
 
-                    if desc.startswith('param_'):
-                        arg_data.name = desc.split(' ')[0].strip().replace('param_', '')
-                    else:
-                        arg_data.name = desc.split(' ')[0].strip()
+    for func_data in func_datas.values():
+        escape_name(func_data.return_type)
+    
+        for arg in func_data.constructor.args.values():
+            arg.name = escape_name(arg.name)
 
-                    desc_line = ' '.join(desc.split(' ')[1:]).strip()
-                    arg_data.nullable = 'may be null' in desc_line
-                    arg_data.description.append(desc_line)
 
-                    last_description_entity = arg_data
+def load_schema(td_api_text:str, cache_path:str|None = None) -> tuple[dict[str,ClassData], dict[str,FuncData]]:
+    '''
+    Parse td_api.tl, reusing the parsed schema from cache_path if it is set.
+    '''
+    if cache_path is not None:
+        parsed = load_parsed(td_api_text, cache_path)
+        if parsed is not None:
+            return parsed
 
-                    last_constructor.args[arg_data.name] = arg_data
+    class_datas, func_datas = parse_schema(td_api_text)
+    escape_names(class_datas, func_datas)
 
-        elif line.startswith(COMMENT_PREFIX + TAG_PREFIX):
-            arg_data = ArgData ()
+    if cache_path is not None:
+        save_parsed(td_api_text, cache_path, class_datas, func_datas)
 
-            if line.startswith(COMMENT_PREFIX + TAG_PREFIX + 'param_'):
-                arg_data.name = line.split(' ')[0].strip('/@').replace('param_', '')
-                desc_line = line.replace(COMMENT_PREFIX + TAG_PREFIX + 'param_' + arg_data.name, '').strip()
-            else:
-                arg_data.name = line.split(' ')[0].strip('/@')
-                desc_line = line.replace(COMMENT_PREFIX + TAG_PREFIX + arg_data.name, '').strip()
-                
-            
-            arg_data.nullable = 'may be null' in desc_line
-            arg_data.description.append(desc_line)
+    return class_datas, func_datas
 
-            last_description_entity = arg_data
 
-            last_constructor.args[arg_data.name] = arg_data
+def generate(td_api_text:str, target_path:str, options:Options|None = None, jobs:int = 1, cache_path:str|None = None) -> Output:
+    '''
+    Generate bindings for td_api_text into target_path/lib and target_path/vapi.
 
-        elif line.startswith(COMMENT_PREFIX + '-'):
-            last_description_entity.description.append(line.replace(COMMENT_PREFIX + '-', '').strip())
+    Nothing is shared between calls, so several generations
+    may run at the same time in one process.
+    '''
+    if options is None:
+        options = Options ()
 
-        else:
-            strs = line.rstrip(';').split(' ')
-            construct_name = strs[0]
-            return_type = strs[-1].strip()
-            
-            func_data = FuncData ()
-            func_data.constructor = last_constructor
-            func_data.name = camel_to_snake(construct_name)
-            func_data.return_type = return_type
+    if options.compact_objects and not (options.static_serializers and options.static_deserializers):
+        raise ValueError('Compact objects have no properties for reflection, they need static serializers and deserializers')
 
-            last_constructor.name = construct_name
-            func_datas[construct_name] = func_data
-            
-            for desc in last_constructor.description:
-                if 'Can be called synchronously' in desc:
-                    func_data.can_be_sync = True
-                    break
+    if options.compact_objects and options.string_interning:
+        raise ValueError('String interning works through property setters, compact objects have plain fields')
 
-            for arg in strs:
-                if arg == construct_name or arg == return_type or arg == '=':
-                    continue
+    if options.update_signals and options.update_batch_window > 0:
+        raise ValueError('Batched updates are delivered only through Client.updates_received, update signals would never be emitted')
 
-                try:
-                    arg_name, arg_type = arg.split(':')
-                except ValueError:
-                    print(arg)
-                    sys.exit(1)
+    target_path_lib = os.path.join(target_path, 'lib')
+    output = Output ()
 
-                if arg_name == 'type':
-                    last_constructor.args[arg_name].name = 'type_'
+    class_datas, func_datas = load_schema(td_api_text, cache_path)
+    class_datas, func_datas = shake(class_datas, func_datas, options.functions, options.updates)
 
-                last_constructor.args[arg_name].type_ = resolve_type(arg_type)
+    files = render_all(collect_tasks(class_datas, func_datas, target_path_lib, options), jobs)
+    write_all(files, output)
 
-for class_data in class_datas.values():
-    class_data.name = escape_name(class_data.name)
-    
-    for constructor in class_data.constructors.values():
-        for arg in constructor.args.values():
-            arg.name = escape_name(arg.name)
+    for dir_name, target_dir in (('lib', target_path_lib), ('vapi', os.path.join(target_path, 'vapi'))):
+        source_dir = os.path.join(PACKAGE_PATH, dir_name)
 
-for func_data in func_datas.values():
-    escape_name(func_data.return_type)
-    
-    for arg in func_data.constructor.args.values():
-        arg.name = escape_name(arg.name)
+        for file_name in os.listdir(source_dir):
+            output.copy_if_changed(os.path.join(source_dir, file_name), target_dir)
 
-for class_data in class_datas.values():
-    create_object(class_data)
-create_td_object()
-for func_data in func_datas.values():
-    create_func_object(func_data)
-create_functions(list(func_datas.values()), class_datas)
-create_req_manager(class_datas)
+    # Objects of types removed from the schema and shards left from a bigger client_shards
+    output.remove_stale(os.path.join(target_path_lib, 'objects'))
+    output.remove_stale(os.path.join(target_path_lib, 'client'))
 
-lib_file_names = os.listdir('lib')
-for file_name in lib_file_names:
-    shutil.copy(os.path.join('lib', file_name), target_path_lib)
-vapi_file_names = os.listdir('vapi')
-for file_name in vapi_file_names:
-    shutil.copy(os.path.join('vapi', file_name), os.path.join(target_path, 'vapi'))
+    return output
@@ -0,0 +1,208 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from .structures import FROM_JSON_DISPATCH, FROM_JSON_METHOD, TO_JSON_METHOD
+from .utils import ArgData, ConstructorData, arg_json_name, camel_to_pascal, format_cases, types_conversion
+
+ARRAY_PREFIX = 'Gee.ArrayList<'
+ARRAY_SUFFIX = '?>'
+NATIVE_ARRAY_SUFFIX = '[]'
+
+# Vector elements that can live in a plain Vala array without boxing
+NATIVE_ELEMENT_TYPES = ['int32', 'int64', 'double', 'bool', 'string']
+
+
+def is_array_type(type_:str) -> bool:
+    return type_.startswith(ARRAY_PREFIX)
+
+def array_element_type(type_:str) -> str:
+    return type_[len(ARRAY_PREFIX):-len(ARRAY_SUFFIX)]
+
+def native_array_type(type_:str) -> str:
+    '''
+    int64[] instead of Gee.ArrayList<int64?> for vectors of primitive types,
+    other types are returned as is.
+    '''
+    if is_array_type(type_) and array_element_type(type_) in NATIVE_ELEMENT_TYPES:
+        return array_element_type(type_) + NATIVE_ARRAY_SUFFIX
+
+    return type_
+
+def is_native_array_type(type_:str) -> bool:
+    return type_.endswith(NATIVE_ARRAY_SUFFIX)
+
+def format_value_to_json(type_:str, value:str, tab_c:int, depth:int = 0) -> list[str]:
+    tab = '    ' * tab_c
+
+    if is_array_type(type_) or is_native_array_type(type_):
+        element = 'element' if depth == 0 else f'element_{depth}'
+        element_type = array_element_type(type_) if is_array_type(type_) else type_[:-len(NATIVE_ARRAY_SUFFIX)]
+
+        return [
+            tab + 'builder.begin_array ();',
+            tab + f'foreach (var {element} in {value}) {{',
+            *format_value_to_json(element_type, element, tab_c + 1, depth + 1),
+            tab + '}',
+            tab + 'builder.end_array ();',
+        ]
+
+    if type_ in ('int32', 'int64'):
+        return [tab + f'builder.add_int_value ({value});']
+
+    if type_ == 'double':
+        return [tab + f'builder.add_double_value ({value});']
+
+    if type_ == 'bool':
+        return [tab + f'builder.add_boolean_value ({value});']
+
+    if type_ == 'string':
+        return [tab + f'builder.add_string_value ({value});']
+
+    if type_ == types_conversion['bytes']:
+        return [tab + f'TDJsoner.serialize_bytes (builder, {value});']
+
+    return [
+        tab + f'if ({value} != null) {{',
+        tab + f'    {value}.to_json (builder);',
+        tab + '} else {',
+        tab + '    builder.add_null_value ();',
+        tab + '}',
+    ]
+
+def format_to_json(tdlib_type:str, args:list[ArgData], modifiers:str, with_extra:bool) -> str:
+    members:list[str] = [
+        '        builder.set_member_name ("@type");',
+        f'        builder.add_string_value ("{tdlib_type}");',
+    ]
+
+    if with_extra:
+        members.append('        builder.set_member_name ("@extra");')
+        members.append('        builder.add_int_value (tdlib_extra);')
+
+    for arg in args:
+        members.append(f'        builder.set_member_name ("{arg_json_name(arg.name)}");')
+        members.extend(format_value_to_json(arg.type_, f'this.{arg.name}', 2))
+
+    return TO_JSON_METHOD.format(
+        modifiers=modifiers,
+        members='\n'.join(members)
+    )
+
+def format_value_from_node(type_:str, node:str) -> str:
+    if type_ == 'int32':
+        return f'(int32) {node}.get_int ()'
+
+    if type_ == 'int64':
+        return f'TDJsoner.node_get_int64 ({node})'
+
+    if type_ == 'double':
+        return f'{node}.get_double ()'
+
+    if type_ == 'bool':
+        return f'{node}.get_boolean ()'
+
+    if type_ == 'string':
+        return f'{node}.get_string ()'
+
+    if type_ == types_conversion['bytes']:
+        return f'TDJsoner.node_get_bytes ({node})'
+
+    return f'{type_}.from_json ({node}.get_object ())'
+
+def format_array_from_node(type_:str, target:str, node:str, tab_c:int, depth:int = 0) -> list[str]:
+    tab = '    ' * tab_c
+    element_type = array_element_type(type_)
+    array = 'array' if depth == 0 else f'array_{depth}'
+    index = 'i' if depth == 0 else f'i_{depth}'
+    element = f'{array}.get_element ({index})'
+
+    out = [
+        tab + f'unowned Json.Array {array} = {node}.get_array ();',
+        tab + f'for (uint {index} = 0; {index} < {array}.get_length (); {index}++) {{',
+    ]
+
+    if is_array_type(element_type):
+        sub_target = 'sub_list' if depth == 0 else f'sub_list_{depth}'
+
+        out.append(tab + f'    var {sub_target} = new {element_type} ();')
+        out.extend(format_array_from_node(element_type, sub_target, element, tab_c + 1, depth + 1))
+        out.append(tab + f'    {target}.add ({sub_target});')
+    else:
+        out.append(tab + f'    {target}.add ({format_value_from_node(element_type, element)});')
+
+    out.append(tab + '}')
+
+    return out
+
+def format_native_array_from_node(type_:str, target:str, node:str, tab_c:int) -> list[str]:
+    tab = '    ' * tab_c
+    element_type = type_[:-len(NATIVE_ARRAY_SUFFIX)]
+
+    return [
+        tab + f'unowned Json.Array array = {node}.get_array ();',
+        tab + f'{target} = new {element_type}[array.get_length ()];',
+        tab + 'for (uint i = 0; i < array.get_length (); i++) {',
+        tab + f'    {target}[i] = {format_value_from_node(element_type, 'array.get_element (i)')};',
+        tab + '}',
+    ]
+
+def format_from_json(class_name:str, tdlib_type:str, args:list[ArgData], modifiers:str, set_type:bool = True) -> str:
+    '''
+    set_type is False for compact objects, their @type is a constant of the class.
+    '''
+    members:list[str] = []
+
+    if set_type:
+        members.append(f'        self.tdlib_type = "{tdlib_type}";')
+
+    for arg in args:
+        node = f'{arg_json_name(arg.name)}_node'
+
+        members.append('')
+        members.append(f'        unowned Json.Node? {node} = json.get_member ("{arg_json_name(arg.name)}");')
+        members.append(f'        if ({node} != null && !{node}.is_null ()) {{')
+
+        if is_array_type(arg.type_):
+            members.extend(format_array_from_node(arg.type_, f'self.{arg.name}', node, 3))
+        elif is_native_array_type(arg.type_):
+            members.extend(format_native_array_from_node(arg.type_, f'self.{arg.name}', node, 3))
+        else:
+            members.append(f'            self.{arg.name} = {format_value_from_node(arg.type_, node)};')
+
+        members.append('        }')
+
+    method = FROM_JSON_METHOD.format(
+        modifiers=modifiers,
+        class_name=class_name,
+        members='\n'.join(members)
+    )
+
+    if not members:
+        # Nothing between creating the object and returning it
+        method = method.replace('\n\n\n', '\n\n', 1)
+
+    return method
+
+def format_from_json_dispatch(class_name:str, constructors:list[ConstructorData]) -> str:
+    cases = []
+    for constructor in constructors:
+        cases.append(format_cases(constructor.name, camel_to_pascal(constructor.name)))
+
+    return FROM_JSON_DISPATCH.format(
+        class_name=class_name,
+        cases='\n'.join(cases)
+    )
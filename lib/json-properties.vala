@@ -0,0 +1,109 @@
+/*
+ * Copyright (C) 2024 Vladimir Vaskov
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program. If not, see <https://www.gnu.org/licenses/>.
+ *
+ * SPDX-License-Identifier: GPL-3.0-or-later
+ */
+
+/**
+ * Закэшированные записываемые свойства класса и их имена в json для
+ * каждого нейм кейса. Создаётся один раз на ``GLib.Type``, поэтому
+ * сериализация и десериализация не выделяют строки под имена.
+ *
+ * @since 0.1.0
+ */
+internal class TDLib.JsonProperties : Object {
+
+    static Quark quark = 0;
+
+    static Mutex mutex;
+
+    /**
+     * Записываемые свойства класса
+     */
+    public ParamSpec[] properties;
+
+    /**
+     * Имена свойств в json, ``[индекс свойства, нейм кейс]``
+     */
+    public string[,] names;
+
+    JsonProperties (Type obj_type) {
+        var class_ref = (ObjectClass) obj_type.class_ref ();
+
+        foreach (ParamSpec property in class_ref.list_properties ()) {
+            if ((property.flags & ParamFlags.WRITABLE) != 0) {
+                properties += property;
+            }
+        }
+
+        names = new string[properties.length, 3];
+
+        for (int i = 0; i < properties.length; i++) {
+            var json_property = strip (properties[i].name, '-');
+            if (json_property.has_prefix ("tdlib-")) {
+                json_property = json_property.replace ("tdlib-", "@");
+            }
+
+            names[i, (int) Case.SNAKE] = kebab2snake (json_property);
+            names[i, (int) Case.KEBAB] = json_property;
+            names[i, (int) Case.CAMEL] = kebab2camel (json_property);
+        }
+    }
+
+    /**
+     * Получить кэш свойств типа. Кэш создаётся при первом обращении
+     * и хранится в qdata типа до конца работы процесса.
+     *
+     * @param obj_type  тип объекта
+     *
+     * @return          кэш свойств
+     */
+    public static unowned JsonProperties get_for_type (Type obj_type) {
+        if (quark == 0) {
+            quark = Quark.from_string ("tdlib-json-properties");
+        }
+
+        unowned JsonProperties? cache = (JsonProperties?) obj_type.get_qdata (quark);
+        if (cache != null) {
+            return cache;
+        }
+
+        mutex.lock ();
+
+        cache = (JsonProperties?) obj_type.get_qdata (quark);
+        if (cache == null) {
+            var new_cache = new JsonProperties (obj_type);
+            obj_type.set_qdata (quark, new_cache.ref ());
+            cache = new_cache;
+        }
+
+        mutex.unlock ();
+
+        return cache;
+    }
+
+    /**
+     * Имя свойства в json
+     *
+     * @param index         индекс свойства в ``properties``
+     * @param names_case    нейм кейс имён элементов в json строке
+     *
+     * @return              имя свойства
+     */
+    public unowned string get_name (int index, Case names_case) {
+        return names[index, (int) names_case];
+    }
+}
@@ -0,0 +1,65 @@
+/*
+ * Copyright (C) 2024 Vladimir Vaskov
+ *
+ * This program is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program. If not, see <https://www.gnu.org/licenses/>.
+ *
+ * SPDX-License-Identifier: GPL-3.0-or-later
+ */
+
+/**
+ * Пул интернированных строк для часто повторяющихся значений полей
+ * (коды языков, MIME типы, эмодзи). Объекты хранят ``unowned`` ссылку на
+ * строку из пула вместо своей копии. Строки пула живут до конца работы
+ * процесса, поэтому его размер ограничен: когда пул заполнен, новые
+ * значения не интернируются и объект хранит свою копию.
+ *
+ * @since 0.1.0
+ */
+internal sealed class TDLib.StringPool : Object {
+
+    /**
+     * Максимальное число строк, добавленных в пул
+     */
+    public static int max_size = 16384;
+
+    static int size = 0;
+
+    /**
+     * Получить строку из пула, добавив её при необходимости.
+     * Потокобезопасен.
+     *
+     * @param value     строка
+     *
+     * @return          строка из пула или ``null``, если ``value`` равна ``null``
+     *                  или пул заполнен
+     */
+    public static unowned string? intern (string? value) {
+        if (value == null) {
+            return null;
+        }
+
+        Quark quark = Quark.try_string (value);
+        if (quark != 0) {
+            return quark.to_string ();
+        }
+
+        if (AtomicInt.get (ref size) >= max_size) {
+            return null;
+        }
+
+        AtomicInt.inc (ref size);
+
+        return GLib.intern_string (value);
+    }
+}
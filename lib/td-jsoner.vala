@@ -35,6 +35,12 @@ internal class TDLib.TDJsoner : Object {
      */
     public Json.Node root { get; construct; }
 
+    /**
+     * Объекты, созданные из элементов массивов корневого объекта во время
+     * потокового парсинга. Ключ — имя элемента json с массивом
+     */
+    HashTable<string, GenericArray<Object>>? streamed = null;
+
     /**
      * Базовый конструктор класса. Выполняет инициализацию для десериализации.
      * Принимает json строку. В случе ошибки при парсинге,
@@ -68,6 +74,145 @@ internal class TDLib.TDJsoner : Object {
         Object (root : node, names_case : names_case);
     }
 
+    /**
+     * Конструктор класса. Выполняет инициализацию для десериализации.
+     * Принимает уже распарсенную json ноду, строка повторно не парсится.
+     * В случе ошибки при переходе по sub_members, выбрасывает ``ApiBase.Error.PARSE``
+     *
+     * @param node          корневая json нода
+     * @param sub_members   массив имён элементов json, по которым нужно пройти до целевой ноды
+     * @param names_case    нейм кейс имён элементов в json строке
+     */
+    public TDJsoner.from_node (
+        Json.Node node,
+        string[]? sub_members = null,
+        Case names_case = Case.KEBAB
+    ) throws JsonError {
+        if (sub_members != null) {
+            node = steps (node, sub_members);
+        }
+
+        Object (root : node, names_case : names_case);
+    }
+
+    /**
+     * Конструктор класса для больших ответов. Элементы-объекты массивов корневого
+     * объекта десериализуются сразу во время парсинга и удаляются из json дерева,
+     * поэтому полное дерево ответа в памяти не держится. Созданные объекты
+     * добавляются в списки результата через ``fill_streamed``.
+     * В случе ошибки при парсинге, выбрасывает ``ApiBase.Error.PARSE``
+     *
+     * @param json_string   json строка
+     * @param creation_func функция создания объекта из элемента массива. Если ``null``,
+     *                      элемент десериализуется через ``deserialize_object``
+     * @param names_case    нейм кейс имён элементов в json строке
+     */
+    public TDJsoner.streaming (
+        string json_string,
+        StreamCreationFunc? creation_func = null,
+        Case names_case = Case.KEBAB
+    ) throws JsonError {
+        var streamed = new HashTable<string, GenericArray<Object>> (str_hash, str_equal);
+        var node = parse_streaming (json_string, creation_func, names_case, streamed);
+
+        Object (root : node, names_case : names_case);
+
+        if (streamed.size () > 0) {
+            this.streamed = streamed;
+        }
+    }
+
+    /**
+     * Функция потокового парсинга для конструктора ``streaming``.
+     *
+     * @param json_string   json строка
+     * @param creation_func функция создания объекта из элемента массива
+     * @param names_case    нейм кейс имён элементов в json строке
+     * @param streamed      таблица, в которую будут добавлены созданные объекты
+     *
+     * @return              корневая нода без десериализованных элементов
+     */
+    static Json.Node parse_streaming (
+        string json_string,
+        StreamCreationFunc? creation_func,
+        Case names_case,
+        HashTable<string, GenericArray<Object>> streamed
+    ) throws JsonError {
+        var current = new GenericArray<Object> ();
+        string? element_error = null;
+        int depth = 0;
+
+        var parser = new Json.Parser ();
+
+        parser.object_start.connect (() => {
+            depth++;
+        });
+        parser.object_end.connect ((object) => {
+            depth--;
+        });
+        parser.array_start.connect (() => {
+            depth++;
+        });
+        parser.array_end.connect ((array) => {
+            depth--;
+        });
+
+        parser.array_element.connect ((array, index) => {
+            // Нужны только массивы, лежащие прямо в корневом объекте
+            if (depth != 2 || element_error != null) {
+                return;
+            }
+
+            // index считается парсером и не учитывает удалённые элементы,
+            // а только что добавленный элемент всегда последний в массиве
+            uint last = array.get_length () - 1;
+
+            unowned Json.Node element = array.get_element (last);
+            if (element.get_node_type () != Json.NodeType.OBJECT) {
+                return;
+            }
+
+            try {
+                if (creation_func != null) {
+                    current.add (creation_func (element.get_object ()));
+                } else {
+                    current.add (new TDJsoner.from_node (element, null, names_case).deserialize_object (null));
+                }
+
+            } catch (JsonError e) {
+                element_error = e.message;
+                return;
+            }
+
+            array.remove_element (last);
+        });
+
+        parser.object_member.connect ((object, member_name) => {
+            if (depth == 1 && current.length > 0) {
+                streamed.insert (member_name, current);
+                current = new GenericArray<Object> ();
+            }
+        });
+
+        try {
+            parser.load_from_data (json_string);
+
+        } catch (GLib.Error e) {
+            throw new JsonError.PARSE ("'%s' is not correct json string".printf (json_string));
+        }
+
+        if (element_error != null) {
+            throw new JsonError.PARSE (element_error);
+        }
+
+        Json.Node? node = parser.get_root ();
+        if (node == null) {
+            throw new JsonError.PARSE ("Json string is empty");
+        }
+
+        return node;
+    }
+
     /**
      * Конструктор класса. Выполняет инициализацию для десериализации.
      * Принимает json строку в виде байтов, объекта ``GLib.Bytes``. В случе ошибки при парсинге,
@@ -255,36 +400,24 @@ internal class TDLib.TDJsoner : Object {
             return;
         }
 
-        builder.begin_object ();
-        var cls = (ObjectClass) api_obj.get_type ().class_ref ();
-
-        foreach (ParamSpec property in cls.list_properties ()) {
-            if (((property.flags & ParamFlags.READABLE) == 0) || ((property.flags & ParamFlags.WRITABLE) == 0)) {
-                continue;
-            }
-
-            var json_property = strip (property.name, '-');
-            if (json_property.has_prefix ("tdlib-")) {
-                json_property = json_property.replace ("tdlib-", "@");
-            }
+        if (names_case == Case.SNAKE && api_obj is Serializable) {
+            ((Serializable) api_obj).to_json (builder);
 
-            switch (names_case) {
-                case Case.CAMEL:
-                    builder.set_member_name (kebab2camel (json_property));
-                    break;
+            return;
+        }
 
-                case Case.SNAKE:
-                    builder.set_member_name (kebab2snake (json_property));
-                    break;
+        builder.begin_object ();
+        unowned JsonProperties json_properties = JsonProperties.get_for_type (api_obj.get_type ());
 
-                case Case.KEBAB:
-                    builder.set_member_name (json_property);
-                    break;
+        for (int i = 0; i < json_properties.properties.length; i++) {
+            unowned ParamSpec property = json_properties.properties[i];
 
-                default:
-                    error ("Unknown case - %s", names_case.to_string ());
+            if ((property.flags & ParamFlags.READABLE) == 0) {
+                continue;
             }
 
+            builder.set_member_name (json_properties.get_name (i, names_case));
+
             var prop_val = Value (property.value_type);
             api_obj.get_property (property.name, ref prop_val);
 
@@ -298,7 +431,7 @@ internal class TDLib.TDJsoner : Object {
                 serialize_object (builder, (Object) prop_val.get_object (), names_case);
 
             } else if (property.value_type == typeof (Bytes)) {
-                builder.add_string_value (Base64.encode (((Bytes) prop_val.get_boxed ()).get_data ()));
+                serialize_bytes (builder, (Bytes) prop_val.get_boxed ());
 
             } else {
                 serialize_value (builder, prop_val);
@@ -308,6 +441,23 @@ internal class TDLib.TDJsoner : Object {
         builder.end_object ();
     }
 
+    /**
+     * Функция для сериализации ``GLib.Bytes`` или ``null`` в base64 строку.
+     *
+     * @param builder       объект ``Json.Builder``
+     * @param bytes         байты, которые нужно сериализовать.
+     *                      Может быть ``null``
+     */
+    internal static void serialize_bytes (Json.Builder builder, Bytes? bytes) {
+        if (bytes == null) {
+            builder.add_null_value ();
+
+            return;
+        }
+
+        builder.add_string_value (Base64.encode (bytes.get_data ()));
+    }
+
     /**
      * Функция для сериализации ``GLib.Value`` или ``null``.
      *
@@ -351,11 +501,48 @@ internal class TDLib.TDJsoner : Object {
     // Deserialize  //
     //////////////////
 
+    /**
+     * Метод для добавления объектов, созданных при потоковом парсинге,
+     * в списки десериализованного корневого объекта.
+     *
+     * @param api_object    объект, созданный из корневой ноды
+     *
+     * @return              тот же объект
+     */
+    public Object fill_streamed (Object api_object) {
+        if (streamed == null) {
+            return api_object;
+        }
+
+        unowned JsonProperties json_properties = JsonProperties.get_for_type (api_object.get_type ());
+
+        for (int i = 0; i < json_properties.properties.length; i++) {
+            unowned ParamSpec property = json_properties.properties[i];
+            unowned GenericArray<Object>? objects = streamed.lookup (json_properties.get_name (i, names_case));
+
+            if (objects == null || property.value_type != typeof (ArrayList)) {
+                continue;
+            }
+
+            var arrayval = Value (property.value_type);
+            api_object.get_property (property.name, ref arrayval);
+            var array_list = (ArrayList<Object>) arrayval.get_object ();
+
+            for (uint j = 0; j < objects.length; j++) {
+                array_list.add (objects[j]);
+            }
+        }
+
+        return api_object;
+    }
+
     public Object deserialize_object (
         string? obj_type_name,
         Json.Node? node = null,
         SubArrayCreationFunc? sub_creation_func = null
     ) throws JsonError {
+        bool is_root = node == null;
+
         if (node == null) {
             node = root;
         }
@@ -372,44 +559,22 @@ internal class TDLib.TDJsoner : Object {
         if (obj_type_name != null) {
             obj_type = Type.from_name (obj_type_name);
         } else {
-            obj_type = Type.from_name ("TDLib" + camel2pascal (node.get_object ().get_string_member ("@type")));
+            obj_type = type_from_tdlib_type (node.get_object ().get_string_member ("@type"));
+        }
+
+        if (obj_type == Type.INVALID) {
+            throw new JsonError.PARSE ("Unknown object type");
         }
 
         var api_object = (Object) Object.new (obj_type);
         api_object.freeze_notify ();
 
-        var class_ref = (ObjectClass) obj_type.class_ref ();
-        ParamSpec[] properties = class_ref.list_properties ();
-
-        foreach (ParamSpec property in properties) {
-            if ((property.flags & ParamFlags.WRITABLE) == 0) {
-                continue;
-            }
+        unowned JsonProperties json_properties = JsonProperties.get_for_type (obj_type);
 
+        for (int i = 0; i < json_properties.properties.length; i++) {
+            unowned ParamSpec property = json_properties.properties[i];
             Type prop_type = property.value_type;
-
-            var json_property = strip (property.name, '-');
-            if (json_property.has_prefix ("tdlib-")) {
-                json_property = json_property.replace ("tdlib-", "@");
-            }
-
-            string member_name;
-            switch (names_case) {
-                case Case.CAMEL:
-                    member_name = kebab2camel (json_property);
-                    break;
-
-                case Case.SNAKE:
-                    member_name = kebab2snake (json_property);
-                    break;
-
-                case Case.KEBAB:
-                    member_name = json_property;
-                    break;
-
-                default:
-                    error ("Unknown case - %s", names_case.to_string ());
-            }
+            unowned string member_name = json_properties.get_name (i, names_case);
 
             if (!node.get_object ().has_member (member_name)) {
                 continue;
@@ -438,16 +603,15 @@ internal class TDLib.TDJsoner : Object {
                     break;
 
                 case Json.NodeType.VALUE:
-                    var val = deserialize_value (sub_node);
-                    if ((val.type () == Type.STRING) && (prop_type == typeof (Bytes))) {
+                    if (prop_type == typeof (Bytes) && sub_node.get_value_type () == Type.STRING) {
                         api_object.set_property (
                             property.name,
-                            new Bytes (Base64.decode (val.get_string ()))
+                            node_get_bytes (sub_node)
                         );
                     } else {
                         api_object.set_property (
                             property.name,
-                            val
+                            deserialize_value (sub_node)
                         );
                     }
                     break;
@@ -463,9 +627,42 @@ internal class TDLib.TDJsoner : Object {
 
         api_object.thaw_notify ();
 
+        if (is_root) {
+            fill_streamed (api_object);
+        }
+
         return api_object;
     }
 
+    /**
+     * Функция для получения ``int64`` из ноды. TDLib передаёт
+     * ``int64`` как строку, а ``int53`` как число, поддерживаются оба варианта.
+     *
+     * @param node      нода со значением
+     *
+     * @return          значение ноды
+     */
+    internal static int64 node_get_int64 (Json.Node node) {
+        if (node.get_value_type () == Type.STRING) {
+            return int64.parse (node.get_string ());
+        }
+
+        return node.get_int ();
+    }
+
+    /**
+     * Функция для получения ``GLib.Bytes`` из ноды с base64 строкой.
+     * Строка ноды не копируется, байты декодируются сразу в буфер,
+     * которым владеет результат.
+     *
+     * @param node      нода с base64 строкой
+     *
+     * @return          декодированные байты
+     */
+    internal static Bytes node_get_bytes (Json.Node node) {
+        return new Bytes.take (Base64.decode (node.get_string ()));
+    }
+
     /**
      * Метод для десериализации значения.
      *
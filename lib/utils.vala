@@ -24,6 +24,11 @@ namespace TDLib {
      */
     public delegate bool SubArrayCreationFunc (out Gee.ArrayList array, Type element_type);
 
+    /**
+     * Create object from json object of streamed array element
+     */
+    public delegate Object StreamCreationFunc (Json.Object json) throws JsonError;
+
     /**
      * Name cases
      */
@@ -47,6 +52,20 @@ namespace TDLib {
         COMMON,
     }
 
+    /**
+     * Object with generated serializer. {@link TDJsoner} uses it
+     * instead of properties reflection
+     */
+    public interface Serializable : Object {
+
+        /**
+         * Write object to json builder with ``snake_case`` member names
+         *
+         * @param builder  json builder
+         */
+        public abstract void to_json (Json.Builder builder);
+    }
+
     /**
      * Delete all {@link char} from start and end of {@link string}
      *
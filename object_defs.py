@@ -15,59 +15,124 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import copy
+import io
 import json
-import os
-import global_args
-from structures import ABSTRACT_CLASS_DEFINITION, CLASS_DEFINITION, CONSTRUCTOR, INTERNAL_CLASS_DEFINITION, INTERNAL_PROPERTY, PROPERTY
-from utils import ArgData, ClassData, FuncData, camel_to_kebeb, camel_to_pascal, camel_to_snake, format_args_const, format_args_obj, format_description, format_header, pascal_to_kebeb, snake_to_kebab
+from .json_defs import format_from_json, format_from_json_dispatch, format_to_json, native_array_type
+from .options import Options
+from .structures import ABSTRACT_CLASS_DEFINITION, ABSTRACT_PROPERTY, CLASS_DEFINITION, COMPACT_CONSTRUCTOR, CONSTRUCTOR, FIELD, INTERNAL_CLASS_DEFINITION, INTERNAL_PROPERTY, INTERNED_PROPERTY, INTERNED_TYPE_PROPERTY, LAST_EXTRA, NEXT_EXTRA, PROPERTY, TYPE_OVERRIDE
+from .utils import ArgData, ClassData, ConstructorData, FuncData, arg_json_name, camel_to_kebeb, camel_to_pascal, camel_to_snake, format_args_const, format_args_obj, format_description, format_header, pascal_to_kebeb, snake_to_kebab
 
 
-def create_td_object ():
-    objects_path = os.path.join(global_args.target_path, 'objects')
-    path = os.path.join(objects_path, 't-d-object.vala')
-
-    if not os.path.exists(objects_path):
-        os.makedirs(objects_path)
-        
-    with open(path, 'w') as file:
-        file.write(format_header())
+def render_td_object (options:Options) -> str:
+    with io.StringIO() as file:
+        file.write(format_header(options.author))
         file.write('\n\n')
         
         file.write(format_description(['Base TDLib object'], 0))
         file.write('\n')
         
         file.write((ABSTRACT_CLASS_DEFINITION + ' {{\n').format(
-            global_args.namespace,
+            options.namespace,
             'TDObject',
             'Object'
         ))
         file.write('\n')
         file.write(format_description(['TDObject @type']))
         file.write('\n')
-        file.write(INTERNAL_PROPERTY.format(
-            'string',
-            'tdlib_type',
-            ''
-        ))
+        if options.compact_objects:
+            file.write(ABSTRACT_PROPERTY.format(
+                'string',
+                'tdlib_type'
+            ))
+        elif options.string_interning:
+            file.write(INTERNED_TYPE_PROPERTY)
+        else:
+            file.write(INTERNAL_PROPERTY.format(
+                'string',
+                'tdlib_type',
+                ''
+            ))
         file.write('\n')
-        file.write(format_description(['TDObject @extra']))
+        file.write(LAST_EXTRA)
         file.write('\n')
-        file.write(INTERNAL_PROPERTY.format(
-            'string',
-            'tdlib_extra',
-            ''
-        ))
+        file.write(format_description(['Next @extra for outgoing request']))
+        file.write('\n')
+        file.write(NEXT_EXTRA)
         file.write('}\n')
 
-def create_object (class_data:ClassData):
-    objects_path = os.path.join(global_args.target_path, 'objects')
-    path = os.path.join(objects_path, pascal_to_kebeb(class_data.name) + '.vala')
+        return file.getvalue()
 
-    if not os.path.exists(objects_path):
-        os.makedirs(objects_path)
+def object_args(constructor:ConstructorData, options:Options) -> list[ArgData]:
+    '''
+    Arguments as object members, compact objects keep primitive vectors in plain arrays.
+    '''
+    if not options.compact_objects:
+        return list(constructor.args.values())
 
-    with open(path, 'w') as file:
-        file.write(format_header())
+    args = []
+    for arg in constructor.args.values():
+        compact_arg = copy.copy(arg)
+        compact_arg.type_ = native_array_type(arg.type_)
+        args.append(compact_arg)
+
+    return args
+
+def write_members(file:io.StringIO, args:list[ArgData], options:Options):
+    for arg in args:
+        file.write(format_description(arg.description))
+        file.write('\n')
+        if options.compact_objects:
+            file.write(FIELD.format(
+                arg.type_ if not arg.nullable else arg.type_ + '?',
+                arg.name,
+                f' = new {arg.type_} ()' if arg.type_.startswith('Gee.ArrayList') else ''
+            ))
+        elif options.string_interning and arg.type_ == 'string' and arg_json_name(arg.name) in options.interned_fields:
+            file.write(INTERNED_PROPERTY.format(
+                type_=arg.type_ if not arg.nullable else arg.type_ + '?',
+                name=arg.name
+            ))
+        else:
+            file.write(PROPERTY.format(
+                arg.type_ if not arg.nullable else arg.type_ + '?',
+                arg.name,
+                f'default = new {arg.type_} (); ' if arg.type_.startswith('Gee.ArrayList') else ''
+            ))
+        file.write('\n')
+
+def format_constructor(constructor:ConstructorData, args:list[ArgData], options:Options) -> str:
+    '''
+    Compact objects assign fields and return their @type from a
+    class constant, others set properties and @type in Object ().
+    '''
+    const_args = ',\n        '.join(format_args_const(args))
+
+    if options.compact_objects:
+        assignments = '\n'.join(map(lambda x: f'        this.{x.name} = {x.name};', args))
+
+        return COMPACT_CONSTRUCTOR.format(
+            constructor_name=camel_to_pascal(constructor.name),
+            args='\n        ' + const_args + '\n    ' if len(const_args) > 0 else '',
+            assignments=assignments
+        ) + '\n' + TYPE_OVERRIDE.format(constructor.name)
+
+    type_arg = ArgData()
+    type_arg.name = 'tdlib_type'
+    type_arg.tdlib_value = f'"{constructor.name}"'
+    type_arg.type_ = 'string'
+
+    o_args=',\n            '.join(format_args_obj(args + [type_arg]))
+
+    return CONSTRUCTOR.format(
+        constructor_name=camel_to_pascal(constructor.name),
+        args='\n        ' + const_args + '\n    ' if len(const_args) > 0 else '',
+        o_args='\n            ' + o_args + '\n        ' if len(o_args) > 0 else ''
+    )
+
+def render_object (class_data:ClassData, options:Options) -> str:
+    with io.StringIO() as file:
+        file.write(format_header(options.author))
         file.write('\n\n')
 
         has_base_constructor:bool = False
@@ -85,42 +150,50 @@ def create_object (class_data:ClassData):
 
             file.write(format_description(constructor.description, 0))
             file.write('\n')
+
+            if class_data.name != 'Error':
+                parent = 'Error'
+            elif options.static_serializers:
+                parent = 'TDObject, Serializable'
+            else:
+                parent = 'TDObject'
+
             file.write((CLASS_DEFINITION + ' {{\n').format(
-                global_args.namespace,
+                options.namespace,
                 class_data.name,
-                'TDObject' if class_data.name == 'Error' else 'Error'
+                parent
             ))
 
             file.write('\n')
 
-            for arg in constructor.args.values():
-                file.write(format_description(arg.description))
-                file.write('\n')
-                file.write(PROPERTY.format(
-                    arg.type_ if not arg.nullable else arg.type_ + '?',
-                    arg.name,
-                    f'default = new {arg.type_} (); ' if arg.type_.startswith('Gee.ArrayList') else ''
-                ))
-                file.write('\n')
+            args = object_args(constructor, options)
+            write_members(file, args, options)
 
             if class_data.name != 'Error':
-                type_arg = ArgData()
-                type_arg.name = 'tdlib_type'
-                type_arg.tdlib_value = f'"{constructor.name}"'
-                type_arg.type_ = 'string'
-
-                extra_arg = ArgData()
-                extra_arg.name = 'tdlib_extra'
-                extra_arg.tdlib_value = 'Uuid.string_random ()'
-                extra_arg.type_ = 'string'
-
-                args = ',\n        '.join(format_args_const(list(constructor.args.values())))
-                o_args=',\n            '.join(format_args_obj(list(constructor.args.values()) + [type_arg, extra_arg]))
-
-                file.write(CONSTRUCTOR.format(
-                    constructor_name=camel_to_pascal(constructor.name),
-                    args='\n        ' + args + '\n    ' if len(args) > 0 else '',
-                    o_args='\n            ' + o_args + '\n        ' if len(o_args) > 0 else ''
+                file.write(format_constructor(constructor, args, options))
+            elif options.compact_objects:
+                # Error has no constructor, but compact objects still need its @type
+                file.write(TYPE_OVERRIDE.format(constructor.name))
+
+            if options.static_serializers:
+                if class_data.name != 'Error' or options.compact_objects:
+                    file.write('\n')
+                file.write(format_to_json(
+                    constructor.name,
+                    args,
+                    'public virtual' if class_data.name == 'Error' else 'public override',
+                    False
+                ))
+
+            if options.static_deserializers:
+                if class_data.name != 'Error' or options.static_serializers:
+                    file.write('\n')
+                file.write(format_from_json(
+                    class_data.name,
+                    constructor.name,
+                    args,
+                    'internal static' if class_data.name == 'Error' else 'internal new static',
+                    not options.compact_objects
                 ))
                 
             file.write('}\n')
@@ -129,64 +202,66 @@ def create_object (class_data:ClassData):
             file.write(format_description(class_data.description, 0))
             file.write('\n')
 
-            file.write((ABSTRACT_CLASS_DEFINITION + ' {{}}\n').format(
-                global_args.namespace,
-                class_data.name,
-                'TDObject' if class_data.name == 'Error' else 'Error'
-            ))
+            if options.static_deserializers:
+                file.write((ABSTRACT_CLASS_DEFINITION + ' {{\n\n').format(
+                    options.namespace,
+                    class_data.name,
+                    'TDObject' if class_data.name == 'Error' else 'Error'
+                ))
+                file.write(format_from_json_dispatch(
+                    class_data.name,
+                    list(class_data.constructors.values())
+                ))
+                file.write('}\n')
+            else:
+                file.write((ABSTRACT_CLASS_DEFINITION + ' {{}}\n').format(
+                    options.namespace,
+                    class_data.name,
+                    'TDObject' if class_data.name == 'Error' else 'Error'
+                ))
 
             for constructor in class_data.constructors.values():
                 file.write('\n')
                 file.write(format_description(constructor.description, 0))
                 file.write('\n')
                 file.write((CLASS_DEFINITION + ' {{\n').format(
-                    global_args.namespace,
+                    options.namespace,
                     camel_to_pascal(constructor.name),
                     class_data.name
                 ))
 
                 file.write('\n')
 
-                for arg in constructor.args.values():
-                    file.write(format_description(arg.description))
+                args = object_args(constructor, options)
+                write_members(file, args, options)
+                file.write(format_constructor(constructor, args, options))
+
+                if options.static_serializers:
                     file.write('\n')
-                    file.write(PROPERTY.format(
-                        arg.type_ if not arg.nullable else arg.type_ + '?',
-                        arg.name,
-                        f'default = new {arg.type_} (); ' if arg.type_.startswith('Gee.ArrayList') else ''
+                    file.write(format_to_json(
+                        constructor.name,
+                        args,
+                        'public override',
+                        False
                     ))
+
+                if options.static_deserializers:
                     file.write('\n')
-                    
-                type_arg = ArgData()
-                type_arg.name = 'tdlib_type'
-                type_arg.tdlib_value = f'"{constructor.name}"'
-                type_arg.type_ = 'string'
-
-                extra_arg = ArgData()
-                extra_arg.name = 'tdlib_extra'
-                extra_arg.tdlib_value = 'Uuid.string_random ()'
-                extra_arg.type_ = 'string'
-
-                args = ',\n        '.join(format_args_const(list(constructor.args.values())))
-                o_args=',\n            '.join(format_args_obj(list(constructor.args.values()) + [type_arg, extra_arg]))
-
-                file.write(CONSTRUCTOR.format(
-                    constructor_name=camel_to_pascal(constructor.name),
-                    args='\n        ' + args + '\n    ' if len(args) > 0 else '',
-                    o_args='\n            ' + o_args + '\n        ' if len(o_args) > 0 else ''
-                ))
+                    file.write(format_from_json(
+                        camel_to_pascal(constructor.name),
+                        constructor.name,
+                        args,
+                        'internal new static',
+                        not options.compact_objects
+                    ))
                 
                 file.write('}\n')
 
-def create_func_object(func_data:FuncData):
-    objects_path = os.path.join(global_args.target_path, 'objects')
-    path = os.path.join(objects_path, snake_to_kebab(func_data.name) + '.vala')
+        return file.getvalue()
 
-    if not os.path.exists(objects_path):
-        os.makedirs(objects_path)
-
-    with open(path, 'w') as file:
-        file.write(format_header())
+def render_func_object(func_data:FuncData, options:Options) -> str:
+    with io.StringIO() as file:
+        file.write(format_header(options.author))
         file.write('\n\n')
         
         constructor = func_data.constructor
@@ -194,9 +269,9 @@ def create_func_object(func_data:FuncData):
         file.write(format_description(constructor.description, 0))
         file.write('\n')
         file.write((INTERNAL_CLASS_DEFINITION + ' {{\n').format(
-            global_args.namespace,
+            options.namespace,
             camel_to_pascal(constructor.name),
-            'TDObject'
+            'TDObject, Serializable' if options.static_serializers else 'TDObject'
         ))
 
         file.write('\n')
@@ -211,6 +286,15 @@ def create_func_object(func_data:FuncData):
             ))
             file.write('\n')
 
+        file.write(format_description(['Request @extra']))
+        file.write('\n')
+        file.write(INTERNAL_PROPERTY.format(
+            'int64',
+            'tdlib_extra',
+            ''
+        ))
+        file.write('\n')
+
         type_arg = ArgData()
         type_arg.name = 'tdlib_type'
         type_arg.tdlib_value = f'"{constructor.name}"'
@@ -218,16 +302,31 @@ def create_func_object(func_data:FuncData):
 
         extra_arg = ArgData()
         extra_arg.name = 'tdlib_extra'
-        extra_arg.tdlib_value = 'Uuid.string_random ()'
-        extra_arg.type_ = 'string'
+        extra_arg.tdlib_value = 'TDObject.next_extra ()'
+        extra_arg.type_ = 'int64'
 
         args = ',\n        '.join(format_args_const(list(constructor.args.values())))
-        o_args=',\n            '.join(format_args_obj(list(constructor.args.values()) + [type_arg, extra_arg]))
+        o_args=',\n            '.join(format_args_obj(list(constructor.args.values()) + ([extra_arg] if options.compact_objects else [type_arg, extra_arg])))
 
         file.write(CONSTRUCTOR.format(
             constructor_name=camel_to_pascal(constructor.name),
             args='\n        ' + args + '\n    ' if len(args) > 0 else '',
             o_args='\n            ' + o_args + '\n        ' if len(o_args) > 0 else ''
         ))
+
+        if options.compact_objects:
+            file.write('\n')
+            file.write(TYPE_OVERRIDE.format(constructor.name))
+
+        if options.static_serializers:
+            file.write('\n')
+            file.write(format_to_json(
+                constructor.name,
+                list(constructor.args.values()),
+                'public',
+                True
+            ))
         
         file.write('}\n')
+
+        return file.getvalue()
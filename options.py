@@ -0,0 +1,108 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+
+# Updates that only carry the latest state of their object, so within a
+# batch window only the last one per object needs to be delivered
+COALESCED_UPDATES = [
+    'updateChatLastMessage',
+    'updateChatReadInbox',
+    'updateUserStatus',
+    'updateFile'
+]
+
+# Scalar string fields with few distinct values, shared through
+# TDLib.StringPool when string interning is on
+INTERNED_FIELDS = [
+    'language_code',
+    'mime_type',
+    'emoji',
+    'editable_username'
+]
+
+
+class Options ():
+    '''
+    Generation settings, passed explicitly to every render function
+    so several generations can run in one process.
+    '''
+    author:str
+    namespace:str
+    # Generated to_json () instead of reflection in TDJsoner
+    static_serializers:bool
+    # Generated from_json () instead of reflection in TDJsoner
+    static_deserializers:bool
+    # Register object GTypes on first use instead of in Client static construct
+    lazy_type_registration:bool
+    # Allowlist of functions (getMe or get_me), None generates all of them
+    functions:list[str]|None
+    # Allowlist of Update constructors (updateNewMessage), None generates all of them
+    updates:list[str]|None
+    # Split Client methods into this many partial class files in lib/client/
+    client_shards:int
+    # Generate TDLib.Stats and record request latencies, parse time, queues and updates
+    instrumentation:bool
+    # Typed signal per Update constructor, updates without handlers are not deserialized
+    update_signals:bool
+    # Collect updates for this many milliseconds and deliver them only with
+    # Client.updates_received, 0 delivers every update right away
+    update_batch_window:int
+    # Update constructors coalesced by their object id within a batch
+    coalesced_updates:list[str]
+    # Objects with plain fields, @type from a class constant and plain arrays
+    # of primitive vectors, needs static serializers and deserializers
+    compact_objects:bool
+    # Intern @type and string fields from interned_fields instead of
+    # keeping a copy in every object
+    string_interning:bool
+    # Json names of string fields interned through TDLib.StringPool
+    interned_fields:list[str]
+
+    def __init__(
+        self,
+        author:str = 'Vladimir Vaskov',
+        namespace:str = 'TDLib',
+        static_serializers:bool = True,
+        static_deserializers:bool = True,
+        lazy_type_registration:bool = True,
+        functions:list[str]|None = None,
+        updates:list[str]|None = None,
+        client_shards:int = 1,
+        instrumentation:bool = False,
+        update_signals:bool = False,
+        update_batch_window:int = 0,
+        coalesced_updates:list[str]|None = None,
+        compact_objects:bool = False,
+        string_interning:bool = False,
+        interned_fields:list[str]|None = None
+    ):
+        self.author = author
+        self.namespace = namespace
+        self.static_serializers = static_serializers
+        self.static_deserializers = static_deserializers
+        self.lazy_type_registration = lazy_type_registration
+        self.functions = functions
+        self.updates = updates
+        self.client_shards = client_shards
+        self.instrumentation = instrumentation
+        self.update_signals = update_signals
+        self.update_batch_window = update_batch_window
+        # Own copies, so changing one Options never changes the module defaults
+        self.coalesced_updates = list(COALESCED_UPDATES if coalesced_updates is None else coalesced_updates)
+        self.compact_objects = compact_objects
+        self.string_interning = string_interning
+        self.interned_fields = list(INTERNED_FIELDS if interned_fields is None else interned_fields)
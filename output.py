@@ -0,0 +1,104 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import filecmp
+import os
+import re
+import shutil
+
+
+YEAR_RE = re.compile(r'Copyright \(C\) \d{4}')
+
+
+def same_content(old:str, new:str) -> bool:
+    '''
+    Compare generated sources ignoring the copyright year in the header,
+    otherwise every new year would rewrite all files.
+    '''
+    if old == new:
+        return True
+
+    return YEAR_RE.sub('', old, 1) == YEAR_RE.sub('', new, 1)
+
+
+class Output ():
+    '''
+    Files of one generation run: what was produced, changed and removed.
+    '''
+    written_paths:set[str]
+    changed_paths:list[str]
+    removed_paths:list[str]
+
+    def __init__(self):
+        self.written_paths = set()
+        self.changed_paths = []
+        self.removed_paths = []
+
+    def write_if_changed(self, path:str, content:str) -> bool:
+        self.written_paths.add(os.path.abspath(path))
+
+        if os.path.exists(path):
+            with open(path) as file:
+                if same_content(file.read(), content):
+                    return False
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'w') as file:
+            file.write(content)
+
+        self.changed_paths.append(path)
+
+        return True
+
+    def copy_if_changed(self, source:str, target_dir:str) -> bool:
+        path = os.path.join(target_dir, os.path.basename(source))
+        self.written_paths.add(os.path.abspath(path))
+
+        if os.path.exists(path) and filecmp.cmp(source, path, shallow=False):
+            return False
+
+        os.makedirs(target_dir, exist_ok=True)
+        shutil.copy(source, path)
+
+        self.changed_paths.append(path)
+
+        return True
+
+    def remove_stale(self, directory:str, extension:str = '.vala') -> list[str]:
+        '''
+        Remove generated files that were not produced in this run,
+        e.g. objects of types removed from the schema.
+        '''
+        removed = []
+
+        if not os.path.isdir(directory):
+            return removed
+
+        for file_name in os.listdir(directory):
+            path = os.path.abspath(os.path.join(directory, file_name))
+
+            if file_name.endswith(extension) and path not in self.written_paths:
+                os.remove(path)
+                removed.append(path)
+
+        if not os.listdir(directory):
+            os.rmdir(directory)
+
+        self.removed_paths.extend(removed)
+
+        return removed
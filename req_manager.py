@@ -1,29 +1,112 @@
-import os
-import global_args
-from structures import CASE, REQ_MANAGER_CLASS
-from utils import ClassData, camel_to_pascal, format_description, format_header
+import io
+from .options import Options
+from .structures import BATCH_FIELDS, BATCH_METHODS, BATCH_STOP, COALESCING_CASE, DELIVER_SUBSCRIBED_UPDATE, DELIVER_UPDATE, DESERIALIZE_ANY, EMIT_UPDATE, QUEUE_UPDATE, INSTRUMENT_PARSE_END, INSTRUMENT_PARSE_START, INSTRUMENT_PENDING, INSTRUMENT_UPDATE, PARSE_RESPONSE, PARSE_WHOLE_RESPONSE, PENDING_REQUEST_CLASS, RECEIVER_CLASS, REQ_MANAGER_CLASS, STATS_CLASS, TYPE_CASE, TYPE_FROM_TDLIB_TYPE
+from .utils import ClassData, ConstructorData, arg_json_name, camel_to_pascal, format_cases, format_description, format_deserialize, format_header
 
 
-def create_req_manager (class_datas:dict[str,ClassData]):
-    path = os.path.join(global_args.target_path, 'requests-manager.vala')
+INT_TYPES = ['int32', 'int64']
 
-    if not os.path.exists(global_args.target_path):
-        os.makedirs(global_args.target_path)
 
-    with open(path, 'w') as file:
-        file.write(format_header())
-        file.write('\n\n')
+def coalescing_key(constructor:ConstructorData, class_datas:dict[str,ClassData]) -> str|None:
+    '''
+    Expression reading the object id an update is about from its json: its
+    first *_id argument, or the id of its first argument object (updateFile
+    file:file). int53 and int64 both resolve to int64 and TDLib sends int64
+    as a string, so the id is read with TDJsoner.node_get_int64.
+    '''
+    args = [arg for arg in constructor.args.values() if not arg.nullable]
 
-        constructors = list(map(lambda x: x.name, class_datas['Update'].constructors.values()))
-        
-        cases = []
-        for constructor in constructors:
-            cases.append(CASE.format(
-                case=constructor,
-                return_type=camel_to_pascal(constructor)
-            ))
+    for arg in args:
+        if arg.name.endswith('_id') and arg.type_ in INT_TYPES:
+            return f'TDJsoner.node_get_int64 (update.get_member ("{arg_json_name(arg.name)}"))'
+
+    for arg in args:
+        class_data = class_datas.get(arg.type_)
+        if class_data is None or len(class_data.constructors) != 1:
+            continue
+
+        id_arg = next(iter(class_data.constructors.values())).args.get('id')
+        if id_arg is not None and id_arg.type_ in INT_TYPES:
+            return f'TDJsoner.node_get_int64 (update.get_object_member ("{arg_json_name(arg.name)}").get_member ("id"))'
+
+    return None
+
+
+def format_batch_methods(class_datas:dict[str,ClassData], options:Options) -> str:
+    cases = []
+    update_constructors = class_datas['Update'].constructors
+    for name in options.coalesced_updates:
+        # Not generated or has no id, delivered without coalescing
+        if name not in update_constructors:
+            continue
+
+        key = coalescing_key(update_constructors[name], class_datas)
+        if key is not None:
+            cases.append(COALESCING_CASE.format(case=name, key=key))
+
+    return BATCH_METHODS.format(
+        cases='\n'.join(cases)
+    )
+
+
+def render_req_manager (class_datas:dict[str,ClassData], options:Options) -> str:
+    with io.StringIO() as file:
+        file.write(format_header(options.author))
+        file.write('\n\n')
 
+        file.write(format_description(['Request waiting for its response'], 0))
+        file.write(PENDING_REQUEST_CLASS)
+        file.write('\n')
+        file.write(format_description(['Process-wide receiver, routes responses to request managers by @client_id'], 0))
+        file.write(RECEIVER_CLASS.format(
+            parse_response=PARSE_WHOLE_RESPONSE if options.compact_objects else PARSE_RESPONSE.format(
+                creation_func='deserialize_any' if options.static_deserializers else 'null'
+            ),
+            parse_start=INSTRUMENT_PARSE_START if options.instrumentation else '',
+            parse_end=INSTRUMENT_PARSE_END if options.instrumentation else ''
+        ))
+        file.write('\n')
         file.write(format_description(['Requests manager'], 0))
+        batched = options.update_batch_window > 0
+
         file.write(REQ_MANAGER_CLASS.format(
-            cases='\n'.join(cases)
+            deserialize_update=format_deserialize('Update', 'response', options),
+            request_pending=INSTRUMENT_PENDING.format(indent='        ', delta='1') if options.instrumentation else '',
+            response_pending=INSTRUMENT_PENDING.format(indent='                ', delta='-1') if options.instrumentation else '',
+            # Requests left unanswered by a stopped client are not pending anymore
+            stop_pending=INSTRUMENT_PENDING.format(indent='        ', delta='-(int) pending_requests.size ()') if options.instrumentation else '',
+            record_update=INSTRUMENT_UPDATE if options.instrumentation else '',
+            deliver_update=QUEUE_UPDATE if batched else DELIVER_SUBSCRIBED_UPDATE.format(deliver=EMIT_UPDATE) if options.update_signals else DELIVER_UPDATE,
+            batch_fields=BATCH_FIELDS.format(window=options.update_batch_window) if batched else '',
+            batch_methods=format_batch_methods(class_datas, options) if batched else '',
+            batch_stop=BATCH_STOP if batched else ''
+        ))
+
+        if options.instrumentation:
+            file.write('\n')
+            file.write(format_description(['Statistics of one client method'], 0))
+            file.write(STATS_CLASS)
+
+        cases = []
+        type_cases = []
+        for class_data in class_datas.values():
+            for constructor in class_data.constructors.values():
+                cases.append(format_cases(constructor.name, camel_to_pascal(constructor.name)))
+                type_cases.append(TYPE_CASE.format(
+                    case=constructor.name,
+                    return_type=camel_to_pascal(constructor.name)
+                ))
+
+        file.write(f'\nnamespace {options.namespace} {{\n')
+        file.write(TYPE_FROM_TDLIB_TYPE.format(
+            cases='\n'.join(type_cases)
         ))
+
+        if options.static_deserializers:
+            file.write(DESERIALIZE_ANY.format(
+                cases='\n'.join(cases)
+            ))
+
+        file.write('}\n')
+
+        return file.getvalue()
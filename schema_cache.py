@@ -0,0 +1,121 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import hashlib
+import os
+import pickle
+import tempfile
+import warnings
+
+from .utils import ClassData, FuncData
+
+
+TD_API_URL = 'https://raw.githubusercontent.com/tdlib/td/refs/heads/master/td/generate/scheme/td_api.tl'
+# Seconds to wait for the server, connecting and between received bytes
+DOWNLOAD_TIMEOUT = 30
+
+# Bump when ArgData/ConstructorData/ClassData/FuncData, their modules or
+# the parser change, so stale pickles are never loaded into a newer generator.
+CACHE_VERSION = 3
+
+
+def default_cache_path() -> str:
+    '''
+    User cache directory, the package directory may be read-only when installed.
+    '''
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(cache_home, 'tdlib2vala')
+
+
+def is_url(source:str) -> bool:
+    return source.startswith('http://') or source.startswith('https://')
+
+
+def read_schema(source:str, cache_path:str, offline:bool = False) -> str:
+    '''
+    Read td_api.tl from a local path or an url.
+    A downloaded schema is kept in cache_path, so an offline run can reuse it.
+    '''
+    if not is_url(source):
+        with open(source) as file:
+            return file.read()
+
+    download_path = os.path.join(cache_path, 'td_api.tl')
+
+    if offline:
+        with open(download_path) as file:
+            return file.read()
+
+    import requests
+
+    # An error page must never be cached and reused offline as the schema
+    response = requests.get(source, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    schema_text = response.text
+
+    try:
+        os.makedirs(cache_path, exist_ok=True)
+        with open(download_path, 'w') as file:
+            file.write(schema_text)
+    except OSError as e:
+        warnings.warn(f'Can\'t keep downloaded schema: {e}')
+
+    return schema_text
+
+
+def schema_hash(schema_text:str) -> str:
+    # Pickles refer to classes by module path, which depends on the name
+    # the package was imported under
+    return hashlib.sha256(f'{CACHE_VERSION}\n{ClassData.__module__}\n{schema_text}'.encode()).hexdigest()
+
+
+def load_parsed(schema_text:str, cache_path:str) -> tuple[dict[str,ClassData], dict[str,FuncData]] | None:
+    path = os.path.join(cache_path, schema_hash(schema_text) + '.pickle')
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    except Exception:
+        # Unreadable, truncated or written by another generator: parse again
+        return None
+
+
+def save_parsed(schema_text:str, cache_path:str, class_datas:dict[str,ClassData], func_datas:dict[str,FuncData]):
+    '''
+    Every writer gets its own temp file, so generations sharing cache_path
+    don't race. The cache is an optimization: a failed write is a warning.
+    '''
+    path = os.path.join(cache_path, schema_hash(schema_text) + '.pickle')
+    tmp_path = None
+
+    try:
+        os.makedirs(cache_path, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump((class_datas, func_datas), file, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_path, path)
+    except OSError as e:
+        warnings.warn(f'Can\'t write parsed schema cache: {e}')
+
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
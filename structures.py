@@ -42,6 +42,45 @@ PROPERTY = '    public {0} {1} {{ get; construct set; {2}}}\n'
 
 INTERNAL_PROPERTY = '    internal {0} {1} {{ get; set; {2}}}\n'
 
+ABSTRACT_PROPERTY = '    internal abstract {0} {1} {{ get; }}\n'
+
+FIELD = '    public {0} {1}{2};\n'
+
+INTERNED_PROPERTY = """    public {type_} {name} {{
+        get {{
+            return _{name};
+        }}
+        construct set {{
+            _{name} = StringPool.intern (value);
+            if (_{name} == null) {{
+                // The pool is full or value is null
+                _{name}_copy = value;
+                _{name} = _{name}_copy;
+            }} else {{
+                _{name}_copy = null;
+            }}
+        }}
+    }}
+
+    unowned string? _{name};
+
+    string? _{name}_copy;
+"""
+
+INTERNED_TYPE_PROPERTY = """    internal string tdlib_type {
+        get {
+            return _tdlib_type;
+        }
+        set {
+            _tdlib_type = GLib.intern_string (value);
+        }
+    }
+
+    unowned string _tdlib_type;
+"""
+
+TYPE_OVERRIDE = '    internal override string tdlib_type {{\n        get {{\n            return "{0}";\n        }}\n    }}\n'
+
 ABSTRACT_CLASS_DEFINITION = 'public abstract class {0}.{1} : {2}'
 
 CLASS_DEFINITION = 'public class {0}.{1} : {2}'
@@ -50,8 +89,94 @@ INTERNAL_CLASS_DEFINITION = 'internal class {0}.{1} : {2}'
 
 CLIENT_CLASS = 'public sealed class {namespace}.Client : Object'
 
+CLIENT_PARTIAL_CLASS = 'public sealed partial class {namespace}.Client : Object'
+
+# Every part of a partial class must repeat its modifiers, valac rejects conflicting ones
+CLIENT_SHARD_CLASS = 'public sealed partial class {namespace}.Client'
+
 METHOD = '    public {type_}{return_type} {name} ({argvn}) {errors}{{{body}}}'
 
+TO_JSON_METHOD = """    {modifiers} void to_json (Json.Builder builder) {{
+        builder.begin_object ();
+
+{members}
+
+        builder.end_object ();
+    }}
+"""
+
+FROM_JSON_METHOD = """    {modifiers} {class_name} from_json (Json.Object json) throws JsonError {{
+        var self = ({class_name}) Object.new (typeof ({class_name}));
+{members}
+
+        return self;
+    }}
+"""
+
+FROM_JSON_DISPATCH = """    internal new static {class_name} from_json (Json.Object json) throws JsonError {{
+        switch (json.get_string_member ("@type")) {{
+{cases}
+
+            default:
+                throw new JsonError.PARSE ("Unknown @type for {class_name}");
+        }}
+    }}
+"""
+
+DESERIALIZE_ANY = """
+    /**
+     * Deserialize any TDLib object by its @type
+     */
+    internal Object deserialize_any (Json.Object json) throws JsonError {{
+        switch (json.get_string_member ("@type")) {{
+{cases}
+
+            default:
+                throw new JsonError.PARSE ("Unknown @type");
+        }}
+    }}
+"""
+
+TYPE_CASE = '            case "{case}":\n                return typeof ({return_type});'
+
+TYPE_FROM_TDLIB_TYPE = """
+    /**
+     * Get GType by TDLib @type, the type is registered on first call
+     */
+    internal Type type_from_tdlib_type (string tdlib_type) {{
+        switch (tdlib_type) {{
+{cases}
+
+            default:
+                return Type.INVALID;
+        }}
+    }}
+"""
+
+LAST_EXTRA = """    // GLib has no 64-bit atomic integers. Where ssize_t is 64-bit the counter
+    // is updated with the pointer-sized atomic add, on 32-bit targets it would
+    // wrap after 2^31 requests, so a mutex guarded int64 is used there
+    static ssize_t last_extra = 0;
+
+    static int64 last_extra_64 = 0;
+
+    static Mutex extra_mutex;
+"""
+
+NEXT_EXTRA = """    internal static int64 next_extra () {
+        // Constant condition, the C compiler keeps only one branch
+        if (sizeof (ssize_t) >= sizeof (int64)) {
+            return (int64) AtomicPointer.add (&last_extra, 1) + 1;
+        }
+
+        extra_mutex.lock ();
+        int64 extra = ++last_extra_64;
+        extra_mutex.unlock ();
+
+        return extra;
+    }
+"""
+
 CONSTRUCT = '    construct {\n\n    }\n'
 
 CLIENT_ID = '    public int client_id { get; private set; }'
@@ -60,6 +185,8 @@ REQ_MANAGER = '    internal RequestManager request_manager { get; set; }'
 
 CONSTRUCTOR = '    public {constructor_name} ({args}) {{\n        Object ({o_args});\n    }}\n'
 
+COMPACT_CONSTRUCTOR = '    public {constructor_name} ({args}) {{\n{assignments}\n    }}\n'
+
 ARG = '{arg_type} {name}{default}'
 
 CLIENT_CONSTR = """
@@ -76,52 +203,210 @@ CLIENT_FINAL = """
     }
 """
 
+UPDATE_SIGNAL = '    public signal void {name} ({type_} update);'
+
+UPDATE_SUBSCRIPTIONS = """
+    /**
+     * Whether update signals have handlers for this update type, updates
+     * nobody listens to are not deserialized
+     */
+    internal bool is_subscribed (string tdlib_type) {{
+        if (has_handlers ("update-recieved")) {{
+            return true;
+        }}
+
+        switch (tdlib_type) {{
+{subscribed_cases}
+
+            default:
+                return false;
+        }}
+    }}
+
+    bool has_handlers (string signal_name) {{
+        return SignalHandler.has_handler_pending (this, Signal.lookup (signal_name, typeof (Client)), 0, false);
+    }}
+
+    internal void emit_update (string tdlib_type, Update update) {{
+        update_recieved (update);
+
+        switch (tdlib_type) {{
+{emit_cases}
+
+            default:
+                break;
+        }}
+    }}
+"""
+
+SUBSCRIBED_CASE = '            case "{case}":\n                return has_handlers ("{signal_name}");'
+
+EMIT_CASE = '            case "{case}":\n                {name} (({type_}) update);\n                break;'
+
+DELIVER_UPDATE = 'client.update_recieved (deserialize_update (response));'
+
+EMIT_UPDATE = 'client.emit_update (tdlib_type, deserialize_update (response));'
+
+QUEUE_UPDATE = 'queue_update (response);'
+
+DELIVER_SUBSCRIBED_UPDATE = """unowned string tdlib_type = response_object.get_string_member ("@type");
+            if (!client.is_subscribed (tdlib_type)) {{
+                return;
+            }}
+
+            {deliver}"""
+
+UPDATES_RECEIVED_SIGNAL = '    public signal void updates_received (Update[] updates);'
+
+BATCH_FIELDS = """
+
+    const uint BATCH_WINDOW = {window};
+
+    TDJsoner?[] update_batch = {{}};
+
+    // Coalescing key to position of its latest update in update_batch
+    HashTable<string, int?> batch_positions = new HashTable<string, int?> (str_hash, str_equal);
+
+    TimeoutSource? flush_source = null;"""
+
+BATCH_METHODS = """
+    void queue_update (TDJsoner response) {{
+        string? key = coalescing_key (response.root.get_object ());
+        if (key != null) {{
+            int? position = batch_positions.lookup (key);
+            if (position != null) {{
+                // Only the latest update per key is delivered, where it came in the stream
+                update_batch[(int) position] = null;
+            }}
+            batch_positions.insert (key, update_batch.length);
+        }}
+
+        update_batch += response;
+
+        if (flush_source == null) {{
+            // Same context as responses and updates are dispatched on
+            flush_source = new TimeoutSource (BATCH_WINDOW);
+            flush_source.set_callback (flush_updates);
+            flush_source.attach (Receiver.get_default ().main_context);
+        }}
+    }}
+
+    bool flush_updates () {{
+        flush_source = null;
+
+        TDJsoner?[] batch = (owned) update_batch;
+        update_batch = {{}};
+        batch_positions.remove_all ();
+
+        Update[] updates = {{}};
+        foreach (unowned TDJsoner? response in batch) {{
+            if (response == null) {{
+                continue;
+            }}
+
+            try {{
+                updates += deserialize_update (response);
+
+            }} catch (JsonError e) {{
+                warning ("%s", e.message);
+            }}
+        }}
+
+        if (updates.length == 0) {{
+            return Source.REMOVE;
+        }}
+
+        client.updates_received (updates);
+
+        return Source.REMOVE;
+    }}
+
+    /**
+     * Updates with the same key supersede each other within the batch window
+     */
+    static string? coalescing_key (Json.Object update) {{
+        switch (update.get_string_member ("@type")) {{
+{cases}
+
+            default:
+                return null;
+        }}
+    }}
+"""
+
+COALESCING_CASE = '            case "{case}":\n                return "{case} " + {key}.to_string ();'
+
+BATCH_STOP = """
+
+        if (flush_source != null) {
+            flush_source.destroy ();
+            flush_source = null;
+        }"""
+
 INIT_BODY = """
         client_id = TDJsonApi.create_client_id ();
         request_manager = new RequestManager (this, timeout);
-        request_manager.run.begin (() => {
-            version = ((OptionValueString) get_option_sync ("version")).value;  
-        });
+        request_manager.run ();
+        version = ((OptionValueString) get_option_sync ("version")).value;
 """
 
 BODY = """
         try {{
 
         var obj = new {target_obj} ({args});
-        string json_response = "";
 
         string json_string = TDJsoner.serialize (obj, Case.SNAKE);
 
         GLib.debug ("send %d %s", client_id, json_string);
 
-        ulong conid = request_manager.recieved.connect ((request_extra, response) => {{
-            if (request_extra == obj.tdlib_extra) {{
-                json_response = response;
-                Idle.add ({func_name}.callback);
-            }}
-        }});
+        var pending_request = new PendingRequest ({func_name}.callback);
+        request_manager.add_pending (obj.tdlib_extra, pending_request);{request_start}
         TDJsonApi.send (client_id, json_string);
 
         yield;
-        SignalHandler.disconnect (request_manager, conid);
 
-        var jsoner = new TDJsoner (json_response, {{ "@type" }}, Case.SNAKE);
-        string tdlib_type = jsoner.deserialize_value ().get_string ();
+        unowned Json.Object response_object = pending_request.response.root.get_object ();{request_end}
 
-        if (tdlib_type == "error") {{
-            jsoner = new TDJsoner (json_response, {{ "message" }}, Case.SNAKE);
-            throw new TDLibError.COMMON (jsoner.deserialize_value ().get_string ());
+        if (response_object.get_string_member ("@type") == "error") {{
+            throw new TDLibError.COMMON (response_object.get_string_member ("message"));
         }}
 
-        jsoner = new TDJsoner (json_response, null, Case.SNAKE);
-        return ({return_type}) jsoner.deserialize_object (null);
+        {deserialize}
 
         }} catch (JsonError e) {{
             throw new TDLibError.COMMON ("Error while parsing json");
         }}
 """
 
-CASE = '            case "{case}":\n                return ({return_type}) jsoner.deserialize_object ("TDLib{return_type}");'
+CASE = '            case "{case}":\n                return {return_type}.from_json (json);'
+
+DESERIALIZE = '({return_type}) {jsoner}.deserialize_object (null)'
+
+STATIC_DESERIALIZE = '({return_type}) {jsoner}.fill_streamed ({return_type}.from_json ({jsoner}.root.get_object ()))'
+
+RETURN_DESERIALIZED = 'return {expression};'
+
+INSTRUMENTED_RETURN_DESERIALIZED = """int64 deserialize_start = get_monotonic_time ();
+        var result = {expression};
+        Stats.get_default ().record_deserialize (get_monotonic_time () - deserialize_start);
+
+        return result;"""
+
+INSTRUMENT_REQUEST_START = '\n        int64 request_start = get_monotonic_time ();'
+
+INSTRUMENT_REQUEST_END = '\n\n        Stats.get_default ().record_call ("{func_name}", get_monotonic_time () - request_start, response_object.get_string_member ("@type") == "error");'
+
+INSTRUMENT_PARSE_START = '\n                int64 parse_start = get_monotonic_time ();\n'
+
+INSTRUMENT_PARSE_END = """
+
+                unowned Stats stats = Stats.get_default ();
+                stats.record_parse (get_monotonic_time () - parse_start);
+                stats.record_queue (responses.length ());"""
+
+INSTRUMENT_PENDING = '\n{indent}Stats.get_default ().record_pending ({delta});'
+
+INSTRUMENT_UPDATE = '\n            Stats.get_default ().record_update (response_object.get_string_member ("@type"));\n'
 
 SYNC_BODY = """
         try {{
@@ -131,25 +416,166 @@ SYNC_BODY = """
         string json_string = TDJsoner.serialize (obj, Case.SNAKE);
 
         GLib.debug ("execute %s", json_string);
+{request_start}
+        unowned string json_response = TDJsonApi.execute (json_string);
 
-        string json_response = TDJsonApi.execute (json_string);
+        var jsoner = new TDJsoner (json_response, null, Case.SNAKE);
+        unowned Json.Object response_object = jsoner.root.get_object ();{request_end}
 
-        var jsoner = new TDJsoner (json_response, {{ "@type" }}, Case.SNAKE);
-        string tdlib_type = jsoner.deserialize_value ().get_string ();
-
-        if (tdlib_type == "error") {{
-            jsoner = new TDJsoner (json_response, {{ "message" }}, Case.SNAKE);
-            throw new TDLibError.COMMON (jsoner.deserialize_value ().get_string ());
+        if (response_object.get_string_member ("@type") == "error") {{
+            throw new TDLibError.COMMON (response_object.get_string_member ("message"));
         }}
 
-        jsoner = new TDJsoner (json_response, null, Case.SNAKE);
-        return ({return_type}) jsoner.deserialize_object (null);
+        {deserialize}
 
         }} catch (JsonError e) {{
             throw new TDLibError.COMMON ("Error while parsing json");
         }}
 """
 
+PENDING_REQUEST_CLASS = """
+internal sealed class TDLib.PendingRequest : Object {
+
+    public TDJsoner? response { get; private set; }
+
+    SourceFunc callback;
+
+    public PendingRequest (owned SourceFunc callback) {
+        this.callback = (owned) callback;
+    }
+
+    /**
+     * Resume the waiting method right away, responses are already
+     * dispatched on the receiver main context
+     */
+    public void complete (TDJsoner response) {
+        this.response = response;
+        callback ();
+    }
+}
+"""
+
+PARSE_RESPONSE = """if (json_response.length < STREAMING_MIN_LENGTH) {{
+                    responses.push (new TDJsoner (json_response, null, Case.SNAKE));
+                }} else {{
+                    responses.push (new TDJsoner.streaming (json_response, {creation_func}, Case.SNAKE));
+                }}"""
+
+# Compact objects have no list properties for TDJsoner.fill_streamed
+PARSE_WHOLE_RESPONSE = 'responses.push (new TDJsoner (json_response, null, Case.SNAKE));'
+
+RECEIVER_CLASS = """
+internal sealed class TDLib.Receiver : Object {{
+
+    const int STREAMING_MIN_LENGTH = 64 * 1024;
+
+    static Receiver? instance = null;
+
+    HashTable<int, RequestManager> managers = new HashTable<int, RequestManager> (direct_hash, direct_equal);
+
+    AsyncQueue<TDJsoner> responses = new AsyncQueue<TDJsoner> ();
+
+    public MainContext main_context {{ get; private set; }}
+
+    Thread<void>? receive_thread = null;
+
+    double timeout;
+
+    int keep_running = 0;
+
+    int dispatch_scheduled = 0;
+
+    construct {{
+        main_context = MainContext.ref_thread_default ();
+    }}
+
+    public static unowned Receiver get_default () {{
+        if (instance == null) {{
+            instance = new Receiver ();
+        }}
+
+        return instance;
+    }}
+
+    public void register (int client_id, RequestManager manager) {{
+        managers.insert (client_id, manager);
+
+        if (receive_thread == null) {{
+            timeout = manager.timeout;
+            AtomicInt.set (ref keep_running, 1);
+            receive_thread = new Thread<void> ("tdlib-receive", receive);
+        }}
+    }}
+
+    public void unregister (int client_id) {{
+        managers.remove (client_id);
+
+        if (managers.size () == 0 && receive_thread != null) {{
+            AtomicInt.set (ref keep_running, 0);
+            receive_thread.join ();
+            receive_thread = null;
+        }}
+    }}
+
+    void receive () {{
+        while (AtomicInt.get (ref keep_running) == 1) {{
+            // Valid until the next td_receive of this thread, it is parsed before that
+            unowned string? json_response = TDJsonApi.receive (timeout);
+            if (json_response == null) {{
+                continue;
+            }}
+
+            try {{{parse_start}
+                {parse_response}{parse_end}
+
+            }} catch (JsonError e) {{
+                warning ("%s: %s", e.message, json_response);
+                continue;
+            }}
+
+            if (AtomicInt.compare_and_exchange (ref dispatch_scheduled, 0, 1)) {{
+                var source = new IdleSource ();
+                source.set_callback (dispatch);
+                source.attach (main_context);
+            }}
+        }}
+    }}
+
+    bool dispatch () {{
+        AtomicInt.set (ref dispatch_scheduled, 0);
+
+        TDJsoner? response;
+        while ((response = responses.try_pop ()) != null) {{
+            try {{
+                route_response (response);
+
+            }} catch (JsonError e) {{
+                warning ("%s", e.message);
+            }}
+        }}
+
+        return Source.REMOVE;
+    }}
+
+    void route_response (TDJsoner response) throws JsonError {{
+        if (response.root.get_node_type () != Json.NodeType.OBJECT) {{
+            throw new JsonError.PARSE ("Response isn't object");
+        }}
+
+        unowned Json.Object response_object = response.root.get_object ();
+
+        if (!response_object.has_member ("@client_id")) {{
+            throw new JsonError.PARSE ("Response has no @client_id");
+        }}
+
+        RequestManager? manager = managers.lookup ((int) response_object.get_int_member ("@client_id"));
+        if (manager != null) {{
+            manager.handle_response (response);
+        }}
+    }}
+}}
+"""
+
 REQ_MANAGER_CLASS = """
 internal sealed class TDLib.RequestManager : Object {{
 
@@ -157,9 +583,7 @@ internal sealed class TDLib.RequestManager : Object {{
 
     public double timeout {{ get; construct set; }}
 
-    public signal void recieved (string request_extra, string response_json);
-
-    bool keep_running = true;
+    HashTable<int64?, PendingRequest> pending_requests = new HashTable<int64?, PendingRequest> (int64_hash, int64_equal);{batch_fields}
 
     public RequestManager (Client client, double timeout) {{
         Object (
@@ -168,40 +592,332 @@ internal sealed class TDLib.RequestManager : Object {{
         );
     }}
 
-    public async void run () {{
-        while (keep_running) {{
-            string? json_response = TDJsonApi.receive (timeout);
-            if (json_response != null) {{
-                try {{
-                    TDJsoner jsoner = new TDJsoner (json_response, {{ "@extra" }}, Case.SNAKE);
-                    string tdlib_extra = jsoner.deserialize_value ().get_string ();
+    public void run () {{
+        Receiver.get_default ().register (client.client_id, this);
+    }}
+
+    public void handle_response (TDJsoner response) throws JsonError {{
+        unowned Json.Object response_object = response.root.get_object ();
 
-                    recieved (tdlib_extra, json_response);
+        if (response_object.has_member ("@extra")) {{
+            int64 tdlib_extra = response_object.get_int_member ("@extra");
 
-                }} catch (JsonError e) {{
-                    TDJsoner jsoner = new TDJsoner (json_response, {{ "@type" }}, Case.SNAKE);
-                    string tdlib_type = jsoner.deserialize_value ().get_string ();
+            PendingRequest? pending_request = pending_requests.lookup (tdlib_extra);
+            if (pending_request != null) {{
+                pending_requests.remove (tdlib_extra);{response_pending}
+                pending_request.complete (response);
+            }}
 
-                    if (tdlib_type.has_prefix ("update")) {{
-                        client.update_recieved (deserialize_update (json_response));
-                    }} else {{
-                        warning ("%s: %s", e.message, json_response);
-                    }}
-                }}
+        }} else if (response_object.get_string_member ("@type").has_prefix ("update")) {{{record_update}
+            // Updates of types that weren't generated are skipped
+            if (type_from_tdlib_type (response_object.get_string_member ("@type")) == Type.INVALID) {{
+                return;
             }}
 
-            Idle.add (run.callback, Priority.LOW);
-            yield;
+            {deliver_update}
+
+        }} else {{
+            throw new JsonError.PARSE ("Response has no @extra and isn't update");
         }}
     }}
 
-    public Update deserialize_update (string json_string) {{
-        var jsoner = new TDJsoner (json_string, null, Case.SNAKE);
-        return (Update) jsoner.deserialize_object (null);
+    public void add_pending (int64 request_extra, PendingRequest pending_request) {{
+        pending_requests.insert (request_extra, pending_request);{request_pending}
     }}
 
+    public Update deserialize_update (TDJsoner response) throws JsonError {{
+        {deserialize_update}
+    }}
+{batch_methods}
     public void stop () {{
-        keep_running = false;
+        Receiver.get_default ().unregister (client.client_id);{stop_pending}{batch_stop}
     }}
 }}
 """
+
+STATS_CLASS = """
+public sealed class TDLib.FunctionStats : Object {
+
+    /**
+     * Latency histogram size: bucket i counts calls faster than 2^i microseconds,
+     * the last bucket counts everything slower
+     */
+    public const int BUCKETS = 24;
+
+    public uint64 calls;
+
+    public uint64 errors;
+
+    /**
+     * Sum of send-to-response latencies, microseconds
+     */
+    public int64 total_latency;
+
+    public int64 max_latency;
+
+    public uint64[] histogram = new uint64[BUCKETS];
+
+    public double mean_latency {
+        get {
+            return calls > 0 ? (double) total_latency / calls : 0;
+        }
+    }
+
+    internal void record (int64 latency, bool error) {
+        calls++;
+        total_latency += latency;
+
+        if (latency > max_latency) {
+            max_latency = latency;
+        }
+        if (error) {
+            errors++;
+        }
+
+        int bucket = 0;
+        while (bucket < BUCKETS - 1 && latency >= ((int64) 1 << bucket)) {
+            bucket++;
+        }
+        histogram[bucket]++;
+    }
+}
+
+/**
+ * Process-wide request and update statistics, collected by the generated
+ * client, request manager and receiver. All times are in microseconds.
+ */
+public sealed class TDLib.Stats : Object {
+
+    [Compact]
+    class Counter {
+        public uint64 value;
+    }
+
+    static Stats? instance = null;
+
+    static Mutex instance_mutex;
+
+    Mutex mutex;
+
+    HashTable<string, FunctionStats> functions = new HashTable<string, FunctionStats> (str_hash, str_equal);
+
+    HashTable<string, Counter> updates = new HashTable<string, Counter> (str_hash, str_equal);
+
+    int64 started_at = get_monotonic_time ();
+
+    uint dump_source_id = 0;
+
+    /**
+     * Time spent parsing received json
+     */
+    public int64 parse_time { get; private set; }
+
+    public uint64 parse_count { get; private set; }
+
+    /**
+     * Time spent deserializing responses and updates into objects
+     */
+    public int64 deserialize_time { get; private set; }
+
+    public uint64 deserialize_count { get; private set; }
+
+    /**
+     * Requests waiting for a response right now, over all clients
+     */
+    public int pending_requests { get; private set; }
+
+    public int max_pending_requests { get; private set; }
+
+    /**
+     * Received responses waiting for dispatch in the main context
+     */
+    public int max_response_queue { get; private set; }
+
+    public static unowned Stats get_default () {
+        if (instance == null) {
+            instance_mutex.lock ();
+            if (instance == null) {
+                instance = new Stats ();
+            }
+            instance_mutex.unlock ();
+        }
+
+        return instance;
+    }
+
+    internal void record_call (string function, int64 latency, bool error) {
+        mutex.lock ();
+
+        FunctionStats? function_stats = functions.lookup (function);
+        if (function_stats == null) {
+            function_stats = new FunctionStats ();
+            functions.insert (function, function_stats);
+        }
+        function_stats.record (latency, error);
+
+        mutex.unlock ();
+    }
+
+    internal void record_parse (int64 time) {
+        mutex.lock ();
+        parse_time += time;
+        parse_count++;
+        mutex.unlock ();
+    }
+
+    internal void record_deserialize (int64 time) {
+        mutex.lock ();
+        deserialize_time += time;
+        deserialize_count++;
+        mutex.unlock ();
+    }
+
+    internal void record_queue (int depth) {
+        mutex.lock ();
+        if (depth > max_response_queue) {
+            max_response_queue = depth;
+        }
+        mutex.unlock ();
+    }
+
+    /**
+     * Every request manager reports its own changes, so the total covers all clients
+     *
+     * @param delta     1 for a sent request, -1 for a completed one
+     */
+    internal void record_pending (int delta) {
+        mutex.lock ();
+        pending_requests += delta;
+        if (pending_requests > max_pending_requests) {
+            max_pending_requests = pending_requests;
+        }
+        mutex.unlock ();
+    }
+
+    internal void record_update (string tdlib_type) {
+        mutex.lock ();
+
+        unowned Counter? counter = updates.lookup (tdlib_type);
+        if (counter == null) {
+            var new_counter = new Counter ();
+            counter = new_counter;
+            updates.insert (tdlib_type, (owned) new_counter);
+        }
+        counter.value++;
+
+        mutex.unlock ();
+    }
+
+    /**
+     * Statistics of a client method, e.g. ``get_me`` or ``get_option_sync``
+     */
+    public FunctionStats? get_function (string function) {
+        mutex.lock ();
+        FunctionStats? function_stats = functions.lookup (function);
+        mutex.unlock ();
+
+        return function_stats;
+    }
+
+    public string[] get_functions () {
+        mutex.lock ();
+        string[] names = {};
+        foreach (unowned string name in functions.get_keys ()) {
+            names += name;
+        }
+        mutex.unlock ();
+
+        return names;
+    }
+
+    public string[] get_update_types () {
+        mutex.lock ();
+        string[] names = {};
+        foreach (unowned string name in updates.get_keys ()) {
+            names += name;
+        }
+        mutex.unlock ();
+
+        return names;
+    }
+
+    public uint64 get_update_count (string tdlib_type) {
+        mutex.lock ();
+        unowned Counter? counter = updates.lookup (tdlib_type);
+        uint64 count = counter != null ? counter.value : 0;
+        mutex.unlock ();
+
+        return count;
+    }
+
+    /**
+     * Updates of the type per second since creation or the last reset
+     */
+    public double get_updates_per_second (string tdlib_type) {
+        double seconds = (get_monotonic_time () - started_at) / 1000000.0;
+
+        return seconds > 0 ? get_update_count (tdlib_type) / seconds : 0;
+    }
+
+    public void reset () {
+        mutex.lock ();
+        functions.remove_all ();
+        updates.remove_all ();
+        started_at = get_monotonic_time ();
+        parse_time = 0;
+        parse_count = 0;
+        deserialize_time = 0;
+        deserialize_count = 0;
+        max_pending_requests = pending_requests;
+        max_response_queue = 0;
+        mutex.unlock ();
+    }
+
+    public string to_string () {
+        var builder = new StringBuilder ();
+
+        builder.append_printf ("parse: %s in %s us\\n", parse_count.to_string (), parse_time.to_string ());
+        builder.append_printf ("deserialize: %s in %s us\\n", deserialize_count.to_string (), deserialize_time.to_string ());
+        builder.append_printf ("pending requests: %d, max %d\\n", pending_requests, max_pending_requests);
+        builder.append_printf ("max response queue: %d\\n", max_response_queue);
+
+        foreach (unowned string name in get_functions ()) {
+            var function_stats = get_function (name);
+            builder.append_printf (
+                "%s: %s calls, %s errors, mean %.0f us, max %s us\\n",
+                name,
+                function_stats.calls.to_string (),
+                function_stats.errors.to_string (),
+                function_stats.mean_latency,
+                function_stats.max_latency.to_string ()
+            );
+        }
+
+        foreach (unowned string tdlib_type in get_update_types ()) {
+            builder.append_printf ("%s: %.1f/s\\n", tdlib_type, get_updates_per_second (tdlib_type));
+        }
+
+        return builder.str;
+    }
+
+    /**
+     * Write statistics with ``GLib.debug`` every interval seconds
+     * in the default main context
+     */
+    public void start_debug_dumps (uint interval) {
+        stop_debug_dumps ();
+
+        dump_source_id = Timeout.add_seconds (interval, () => {
+            debug ("%s", to_string ());
+            return Source.CONTINUE;
+        });
+    }
+
+    public void stop_debug_dumps () {
+        if (dump_source_id != 0) {
+            Source.remove (dump_source_id);
+            dump_source_id = 0;
+        }
+    }
+}
+"""
@@ -0,0 +1,178 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import re
+
+from .utils import ArgData, ClassData, ConstructorData, FuncData, camel_to_snake, resolve_type
+
+
+FUNCTIONS_SEPARATOR = '---functions---'
+COMMENT_PREFIX = '//'
+
+# //@class Name @description text
+CLASS_RE = re.compile(r'//@class\s+(\S+)\s*@description\s*(.*)')
+# @tag text, a //@description line holds several of them
+DOC_TAG_RE = re.compile(r'@(\S+) ?([^@]*)')
+# //@tag text, a single tag on its own line
+ARG_LINE_RE = re.compile(r'//@(\S+)\s*(.*)')
+
+SYNC_MARK = 'Can be called synchronously'
+
+
+class TLParseError(ValueError):
+
+    def __init__(self, line_number:int, line:str, message:str):
+        super().__init__(f'line {line_number}: {message}: {line}')
+        self.line_number = line_number
+        self.line = line
+
+
+def new_arg(tag:str, text:str) -> ArgData:
+    arg_data = ArgData ()
+
+    arg_data.name = tag.removeprefix('param_')
+    arg_data.nullable = 'may be null' in text
+    arg_data.description.append(text)
+
+    return arg_data
+
+
+def parse_schema(td_api_text:str) -> tuple[dict[str,ClassData], dict[str,FuncData]]:
+    '''
+    Parse td_api.tl into ClassData (types) and FuncData (functions).
+    Everything before the first comment (builtin types) is skipped.
+    '''
+    class_datas:dict[str,ClassData] = {}
+    func_datas:dict[str,FuncData] = {}
+
+    is_start = False
+    is_functions = False
+
+    last_constructor:ConstructorData|None = None
+    last_description_entity = None
+
+    for line_number, line in enumerate(td_api_text.splitlines(), 1):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        if FUNCTIONS_SEPARATOR in line:
+            is_functions = True
+            continue
+
+        if not line.startswith(COMMENT_PREFIX):
+            if not is_start:
+                continue
+
+            if last_constructor is None:
+                raise TLParseError(line_number, line, 'combinator without description')
+
+            strs = line.rstrip(';').split(' ')
+            construct_name = strs[0]
+            result_name = strs[-1]
+
+            last_constructor.name = construct_name
+
+            if is_functions:
+                func_data = FuncData ()
+                func_data.constructor = last_constructor
+                func_data.name = camel_to_snake(construct_name)
+                func_data.return_type = result_name
+                func_data.can_be_sync = any(SYNC_MARK in desc for desc in last_constructor.description)
+
+                func_datas[construct_name] = func_data
+
+            else:
+                if result_name.lower() == construct_name.lower():
+                    class_data = ClassData ()
+                    class_data.description.append('')
+                    class_data.name = result_name
+
+                    class_datas[result_name] = class_data
+
+                elif result_name not in class_datas:
+                    raise TLParseError(line_number, line, f'unknown class {result_name}')
+
+                class_datas[result_name].constructors[construct_name] = last_constructor
+
+            args = last_constructor.args
+
+            for field in strs[1:-1]:
+                if field == '=':
+                    continue
+
+                arg_name, sep, arg_type = field.partition(':')
+
+                if not sep:
+                    raise TLParseError(line_number, line, f'malformed field {field}')
+                if arg_name not in args:
+                    raise TLParseError(line_number, line, f'undocumented field {arg_name}')
+
+                if arg_name == 'type':
+                    args[arg_name].name = 'type_'
+
+                args[arg_name].type_ = resolve_type(arg_type)
+
+            continue
+
+        is_start = True
+
+        if line[2:3] == '-':
+            if last_description_entity is None:
+                raise TLParseError(line_number, line, 'continuation without description')
+
+            last_description_entity.description.append(line[3:].strip())
+
+        elif line.startswith('//@class') and not is_functions:
+            match = CLASS_RE.match(line)
+
+            if match is None:
+                raise TLParseError(line_number, line, 'malformed class')
+
+            class_data = ClassData ()
+            class_data.name = match.group(1)
+            class_data.description.append(match.group(2).strip())
+
+            class_datas[class_data.name] = class_data
+            last_description_entity = class_data
+
+        elif line.startswith('//@description'):
+            last_constructor = ConstructorData ()
+
+            for tag, text in DOC_TAG_RE.findall(line):
+                text = text.strip()
+
+                if tag == 'description':
+                    last_constructor.description.append(text)
+                    last_description_entity = last_constructor
+                else:
+                    arg_data = new_arg(tag, text)
+                    last_constructor.args[arg_data.name] = arg_data
+                    last_description_entity = arg_data
+
+        elif line.startswith('//@'):
+            if last_constructor is None:
+                raise TLParseError(line_number, line, 'field description before @description')
+
+            tag, text = ARG_LINE_RE.match(line).groups()
+
+            arg_data = new_arg(tag, text.strip())
+            last_constructor.args[arg_data.name] = arg_data
+            last_description_entity = arg_data
+
+    return class_datas, func_datas
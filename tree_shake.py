@@ -0,0 +1,112 @@
+# Copyright (C) 2024 Vladimir Vaskov
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import copy
+import re
+
+from .utils import ClassData, FuncData, camel_to_pascal
+
+
+UPDATE_CLASS = 'Update'
+
+# Used by the generated runtime itself: Error is the base of every object,
+# Update is the update_recieved signal type and getOption is called by Client.init
+REQUIRED_CLASSES = ['Error', UPDATE_CLASS]
+REQUIRED_FUNCTIONS = ['getOption']
+
+IDENTIFIER_RE = re.compile(r'\w+')
+
+
+def find_function(func_datas:dict[str,FuncData], name:str) -> str:
+    '''
+    Function key by td_api name (getMe) or method name (get_me).
+    '''
+    if name in func_datas:
+        return name
+
+    for key, func_data in func_datas.items():
+        if func_data.name == name:
+            return key
+
+    raise ValueError(f'Unknown function {name}')
+
+
+def shake(class_datas:dict[str,ClassData], func_datas:dict[str,FuncData], functions:list[str]|None, updates:list[str]|None) -> tuple[dict[str,ClassData], dict[str,FuncData]]:
+    '''
+    Keep only functions from the allowlist, update constructors from the
+    allowlist and every class reachable from them through argument and
+    return types. None means no restriction. Passed dicts are not modified.
+    '''
+    if functions is None and updates is None:
+        return class_datas, func_datas
+
+    class_keys = {camel_to_pascal(key): key for key in class_datas}
+
+    if functions is None:
+        func_keys = list(func_datas)
+    else:
+        func_keys = [find_function(func_datas, name) for name in REQUIRED_FUNCTIONS + functions]
+
+    update_class = class_datas[UPDATE_CLASS]
+
+    if updates is None:
+        update_constructors = update_class.constructors
+    else:
+        update_constructors = {}
+        for name in updates:
+            if name not in update_class.constructors:
+                raise ValueError(f'Unknown update {name}')
+            update_constructors[name] = update_class.constructors[name]
+
+    shaken_update_class = copy.copy(update_class)
+    shaken_update_class.constructors = update_constructors
+
+    classes = {UPDATE_CLASS: shaken_update_class}
+    queue:list[str] = []
+
+    def visit(type_:str):
+        for identifier in IDENTIFIER_RE.findall(type_):
+            key = class_keys.get(identifier)
+            if key is not None and key not in classes:
+                classes[key] = class_datas[key]
+                queue.append(key)
+
+    for name in REQUIRED_CLASSES:
+        visit(name)
+
+    for constructor in update_constructors.values():
+        for arg in constructor.args.values():
+            visit(arg.type_)
+
+    for key in func_keys:
+        func_data = func_datas[key]
+
+        visit(func_data.return_type)
+        for arg in func_data.constructor.args.values():
+            visit(arg.type_)
+
+    while queue:
+        for constructor in classes[queue.pop()].constructors.values():
+            for arg in constructor.args.values():
+                visit(arg.type_)
+
+    # Keep schema order, it is the order of generated switch cases
+    shaken_classes = {key: classes[key] for key in class_datas if key in classes}
+    func_keys = set(func_keys)
+    shaken_functions = {key: func_datas[key] for key in func_datas if key in func_keys}
+
+    return shaken_classes, shaken_functions
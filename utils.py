@@ -17,8 +17,8 @@
 
 from datetime import datetime
 
-from structures import ARG, CASE, HEADER, INIT_BODY, METHOD
-import global_args
+from .options import Options
+from .structures import ARG, CASE, DESERIALIZE, HEADER, INIT_BODY, INSTRUMENTED_RETURN_DESERIALIZED, METHOD, RETURN_DESERIALIZED, STATIC_DESERIALIZE
 
 types_conversion = {
     'double': 'double',
@@ -150,6 +150,9 @@ def escape_name(type_:str) -> str:
 
     return type_
 
+def arg_json_name(name:str) -> str:
+    return name.strip('_')
+
 def format_description(description:list[str], tab_c:int = 1) -> str:
     MAX_SIZE = 70
     
@@ -183,6 +186,17 @@ def format_cases(constructor_name:str, return_type:str) -> str:
         case=constructor_name
     )
 
+def format_deserialize(return_type:str, jsoner:str, options:Options) -> str:
+    expression = (STATIC_DESERIALIZE if options.static_deserializers else DESERIALIZE).format(
+        return_type=return_type,
+        jsoner=jsoner
+    )
+
+    if options.instrumentation:
+        return INSTRUMENTED_RETURN_DESERIALIZED.format(expression=expression)
+
+    return RETURN_DESERIALIZED.format(expression=expression)
+
 def format_method(return_type:str, name:str, argv:list[str], body:list[str], async_:bool, errors:list[str] = ['TDLibError']):
     arg = ',\n        '.join(argv)
     b = '\n        '.join(body)
@@ -207,5 +221,5 @@ def format_init_method():
         errors='throws TDLibError '
     )
 
-def format_header () -> str:
-    return HEADER.format(year=str(datetime.now().year), author=global_args.author)
+def format_header (author:str) -> str:
+    return HEADER.format(year=str(datetime.now().year), author=author)